@@ -0,0 +1,109 @@
+"""
+🕒 ACTIVITY TRACKER
+Records trading_users.last_active touches in memory and writes them back in batches
+Keeps portfolio reads from turning into row writes. The in-memory view only covers this
+process (one worker / serverless instance); trading_users.last_active stays the source of truth.
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+from psycopg2.extras import execute_values
+
+FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", "5"))  # seconds between batched writes
+ACTIVE_WINDOW = 24 * 3600  # what snapshot_portfolios considers "active"
+
+
+class ActivityTracker:
+    """Buffers last_active bumps per user and flushes them on a background thread"""
+
+    def __init__(self, connect: Callable, flush_interval: float = FLUSH_INTERVAL,
+                 retention: float = ACTIVE_WINDOW):
+        self.connect = connect
+        self.flush_interval = flush_interval
+        self.retention = retention
+        self.pending: Dict[int, float] = {}  # user_id -> last touch not yet written
+        self.recent: Dict[int, float] = {}   # user_id -> last touch within `retention`
+        self.lock = threading.Lock()
+        self._thread = None
+        # Daemon flusher dies with the process - write what's left on the way out
+        atexit.register(self.flush)
+
+    def touch(self, user_id: int):
+        """Record activity for a user - no DB work on the caller's path"""
+        now = time.time()
+        with self.lock:
+            self.pending[user_id] = now
+            self.recent[user_id] = now
+        self._ensure_flusher()
+
+    # ─────────────────────────────────────────────────────
+    # ACTIVE USERS (this process only)
+    # ─────────────────────────────────────────────────────
+
+    def active_user_ids(self, window: float = ACTIVE_WINDOW) -> List[int]:
+        cutoff = time.time() - window
+        with self.lock:
+            return [user_id for user_id, ts in self.recent.items() if ts > cutoff]
+
+    def active_count(self, window: float = ACTIVE_WINDOW) -> int:
+        return len(self.active_user_ids(window))
+
+    # ─────────────────────────────────────────────────────
+    # FLUSHING
+    # ─────────────────────────────────────────────────────
+
+    def flush(self) -> int:
+        """Write all pending touches in a single UPDATE ... FROM (VALUES ...)"""
+        now = time.time()
+        with self.lock:
+            batch, self.pending = self.pending, {}
+            # Forget users idle for longer than we report on
+            cutoff = now - self.retention
+            stale = [user_id for user_id, ts in self.recent.items() if ts <= cutoff]
+            for user_id in stale:
+                del self.recent[user_id]
+        if not batch:
+            return 0
+
+        # Send "seconds ago" rather than wall-clock times so app/DB timezones can't disagree
+        rows = [(user_id, now - ts) for user_id, ts in batch.items()]
+        conn = None
+        try:
+            conn = self.connect()
+            cur = conn.cursor()
+            execute_values(cur, """
+                UPDATE trading_users AS u
+                SET last_active = CURRENT_TIMESTAMP - make_interval(secs => v.age)
+                FROM (VALUES %s) AS v(id, age)
+                WHERE u.id = v.id
+            """, rows, template="(%s::int, %s::float8)", page_size=1000)
+            conn.commit()
+            return len(rows)
+        except Exception as e:
+            print(f"⚠️ Activity flush failed ({len(rows)} users): {e}")
+            # Put the touches back so the next flush retries them
+            with self.lock:
+                for user_id, ts in batch.items():
+                    self.pending[user_id] = max(ts, self.pending.get(user_id, 0))
+            return 0
+        finally:
+            if conn:
+                conn.close()
+
+    def _ensure_flusher(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self.lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._flush_loop, name="activity-flusher", daemon=True)
+            self._thread.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
@@ -212,84 +212,8 @@ def get_trending_tokens(
 
 # --- SCORING LOGIC ---
 
-def calculate_zenith_score(pair: dict) -> float:
-    """
-    Calculates the Zenith Score (0-100) for crypto tokens based on momentum and volume.
-    Formula: (0.5 * Price Change Factor) + (0.3 * Vol/Liq Factor) + (0.2 * Social Factor)
-    """
-    # Existing Crypto Logic
-    try:
-        price_change = pair.get('priceChange', {})
-        h1 = float(price_change.get('h1', 0))
-        h6 = float(price_change.get('h6', 0))
-        h24 = float(price_change.get('h24', 0))
-        
-        # 1. Momentum Score (50%)
-        momentum_score = 0
-        if h1 > 0: momentum_score += 10
-        if h1 > 5: momentum_score += 10
-        if h6 > 0: momentum_score += 15
-        if h6 > 10: momentum_score += 15
-        if h24 > 0: momentum_score += 20
-        if h24 > 15: momentum_score += 30
-        momentum_score = min(momentum_score, 100)
-        
-        # 2. Volume/Liquidity Score (30%)
-        liquidity = float(pair.get('liquidity', {}).get('usd', 0))
-        volume = float(pair.get('volume', {}).get('h24', 0))
-        
-        vol_score = 0
-        if liquidity > 0:
-            vol_ratio = volume / liquidity
-            if vol_ratio > 0.1: vol_score += 20
-            if vol_ratio > 0.5: vol_score += 30
-            if vol_ratio > 1.0: vol_score += 50
-        
-        if liquidity > 50000: vol_score += 20
-        if volume > 100000: vol_score += 30
-        vol_score = min(vol_score, 100)
-        
-        # 3. Social/Viral Score (20%) - Placeholder
-        social_score = 50 
-
-        final_score = (0.5 * momentum_score) + (0.3 * vol_score) + (0.2 * social_score)
-        return round(min(final_score, 100), 2)
-    except Exception:
-        return 0.0
-
-def calculate_stock_score(stock: dict) -> float:
-    """
-    Zenith Score logic for Stocks.
-    Focuses on Trend Strength (Moving Averages) and Volume.
-    """
-    try:
-        price = stock.get('price', 0)
-        change = stock.get('changesPercentage', 0)
-        volume = stock.get('volume', 0)
-        avg_volume = stock.get('avgVolume', 1)
-        
-        # 1. Trend Score (Price Change) - 50%
-        trend_score = 50 # Start neutral
-        if change > 0: trend_score += 10
-        if change > 2: trend_score += 20
-        if change > 5: trend_score += 20
-        if change < 0: trend_score -= 10
-        if change < -2: trend_score -= 20
-        trend_score = max(0, min(100, trend_score))
-
-        # 2. Volume Score (Rel to Avg) - 30%
-        vol_score = 50
-        if volume > avg_volume: vol_score += 20
-        if volume > avg_volume * 1.5: vol_score += 30
-        vol_score = min(100, vol_score)
-
-        # 3. 'Stability' Score - 20% (Placeholder for now, assumes large cap is stable)
-        stability_score = 80 
-
-        final_score = (0.5 * trend_score) + (0.3 * vol_score) + (0.2 * stability_score)
-        return round(final_score, 0)
-    except Exception:
-        return 50.0
+# Vendored copy of the repo root's zenith_scoring.py, so this API also runs on its own
+from zenith_scoring import calculate_zenith_score, calculate_stock_score
 
 # --- ENDPOINTS ---
 
@@ -0,0 +1,101 @@
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+from bs4 import BeautifulSoup
+
+import enhanced_scraper
+from enhanced_scraper import CATEGORY_KEYWORDS, DOMAIN_HINTS, detect_category
+
+
+class RegexCounter:
+    """The previous implementation: one re.findall scan per keyword"""
+
+    def count(self, text):
+        counts = Counter()
+        for keywords in CATEGORY_KEYWORDS.values():
+            for keyword in keywords:
+                found = len(re.findall(r'\b' + re.escape(keyword.lower()) + r'\b', text))
+                if found:
+                    counts[keyword.lower()] = found
+        return counts
+
+
+def load_saved_pages(directory):
+    """(title, text, url, source) per saved .html page, extracted like scrape_article does"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith((".html", ".htm")):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        h1 = soup.find("h1")
+        title = h1.get_text(strip=True) if h1 else (soup.title.get_text(strip=True) if soup.title else name)
+        paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
+        text = " ".join([p for p in paragraphs if len(p) > 50][:40])
+        corpus.append((title, text, f"https://example.com/{name}", None))
+    return corpus
+
+
+def synthetic_corpus(count, seed=11):
+    """Keyword-dense articles, including the cases word-boundary matching must get right"""
+    rng = random.Random(seed)
+    keywords = [k for ks in CATEGORY_KEYWORDS.values() for k in ks]
+    filler = ("the of and to in is it for on with as said year new people report "
+              "banking marketing datas players' e-sports co-ceo").split()
+    tricky = ["mental  health", "mental-health", "Mental Health", "world cup's", "ai.", "(nba)",
+              "stock-market", "bank_account", "web3.0", "tv show\nseries", "ceo/cfo"]
+    sources = list(DOMAIN_HINTS) + ["example.com", None]
+    corpus = []
+    for i in range(count):
+        words = []
+        for _ in range(rng.randint(300, 1200)):
+            roll = rng.random()
+            words.append(rng.choice(keywords) if roll < 0.12 else rng.choice(tricky) if roll < 0.15
+                         else rng.choice(filler))
+        title = " ".join(rng.choice(keywords + filler).title() for _ in range(8))
+        corpus.append((title, " ".join(words), f"https://news.example.com/{rng.choice(['business', 'sports', 'x'])}/{i}",
+                       rng.choice(sources)))
+    return corpus
+
+
+def run_benchmark(pages_dir=None, count=300):
+    corpus = load_saved_pages(pages_dir) if pages_dir else synthetic_corpus(count)
+    label = f"{len(corpus)} saved pages from {pages_dir}" if pages_dir else f"{len(corpus)} synthetic articles"
+    print(f"🚀 Category detection benchmark: {label}")
+
+    matcher = enhanced_scraper.CATEGORY_MATCHER
+    start = time.perf_counter()
+    fast = [detect_category(*doc) for doc in corpus]
+    fast_time = time.perf_counter() - start
+
+    enhanced_scraper.CATEGORY_MATCHER = RegexCounter()
+    try:
+        start = time.perf_counter()
+        slow = [detect_category(*doc) for doc in corpus]
+        slow_time = time.perf_counter() - start
+    finally:
+        enhanced_scraper.CATEGORY_MATCHER = matcher
+
+    mismatches = [i for i, (a, b) in enumerate(zip(fast, slow)) if a != b]
+
+    print("\n════════════════════════════════════")
+    print("      CATEGORY DETECTION RESULTS    ")
+    print("════════════════════════════════════")
+    print(f"Per-keyword regex: {len(corpus) / slow_time:>10,.0f} articles/sec")
+    print(f"Single-pass:       {len(corpus) / fast_time:>10,.0f} articles/sec")
+    print(f"Speedup:           {slow_time / fast_time:.1f}x")
+    print(f"Identical results: {'✅' if not mismatches else f'❌ {len(mismatches)} differ'}")
+    print("════════════════════════════════════")
+    if mismatches:
+        i = mismatches[0]
+        print(f"First mismatch: {fast[i]} vs {slow[i]}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    # python benchmark_category.py [directory of saved .html pages]
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+import time
+
+from html_extract import BACKENDS, LXML_AVAILABLE
+
+
+def load_fixtures(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+    return pages
+
+
+def synthetic_fixtures(count, seed=5):
+    """News-page-shaped HTML: heavy head and nav, inline markup, entities, comments, long bodies"""
+    rng = random.Random(seed)
+    words = ("markets rallied after the central bank said inflation had cooled while analysts "
+             "warned that the outlook remains uncertain for investors across the region").split()
+
+    def sentence(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    pages = []
+    for i in range(count):
+        head = "<script>" + "var x = 1;" * rng.randint(200, 2000) + "</script>" + \
+               "".join(f'<link rel="preload" href="/s/{j}.css">' for j in range(40))
+        nav = "<nav><ul>" + "".join(f"<li><a href='/s{j}'><p>Section {j}</p></a></li>" for j in range(60)) + "</ul></nav>"
+        body = []
+        for j in range(rng.randint(10, 120)):
+            style = rng.random()
+            if style < 0.2:
+                body.append(f"<p>{sentence(12)} <a href='/x'>{sentence(3)}</a> {sentence(8)} &amp; more</p>")
+            elif style < 0.3:
+                body.append(f"<p>\n  {sentence(15)} <!-- ad slot --> <em>{sentence(5)}</em>\n</p>")
+            elif style < 0.4:
+                body.append(f"<p>{sentence(4)}</p>")  # too short to keep
+            else:
+                body.append(f"<p>{sentence(rng.randint(10, 40))}</p>")
+        h1 = f"<h1>Headline <span>{i}</span></h1>" if rng.random() < 0.9 else ""
+        footer = "<footer>" + "".join(f"<p>Footer link {j} {sentence(12)}</p>" for j in range(30)) + "</footer>"
+        pages.append(f"<!DOCTYPE html><html><head><title>Page {i} | News</title>{head}</head>"
+                     f"<body>{nav}<article>{h1}{''.join(body)}</article>{footer}</body></html>")
+    return pages
+
+
+def run_benchmark(fixtures_dir=None, count=200):
+    if not LXML_AVAILABLE:
+        print("❌ lxml is not installed - only the bs4 backend is available")
+        return
+    pages = load_fixtures(fixtures_dir) if fixtures_dir else synthetic_fixtures(count)
+    size_mb = sum(len(p) for p in pages) / 1e6
+    print(f"🚀 HTML extraction benchmark: {len(pages)} pages ({size_mb:.1f} MB)")
+
+    results, timings = {}, {}
+    for name in ("bs4", "lxml"):
+        start = time.perf_counter()
+        results[name] = [BACKENDS[name](page) for page in pages]
+        timings[name] = time.perf_counter() - start
+
+    identical = sum(a == b for a, b in zip(results["bs4"], results["lxml"]))
+    same_title = sum(a.title == b.title for a, b in zip(results["bs4"], results["lxml"]))
+
+    print("\n════════════════════════════════════")
+    print("      HTML EXTRACTION RESULTS       ")
+    print("════════════════════════════════════")
+    for name in ("bs4", "lxml"):
+        print(f"{name:5} {len(pages) / timings[name]:>8,.1f} pages/sec  ({size_mb / timings[name]:.1f} MB/s)")
+    print(f"Speedup:          {timings['bs4'] / timings['lxml']:.1f}x")
+    print(f"Identical output: {identical}/{len(pages)} pages")
+    print(f"Same title:       {same_title}/{len(pages)} pages")
+    print("════════════════════════════════════")
+    for i, (a, b) in enumerate(zip(results["bs4"], results["lxml"])):
+        if a != b:
+            print(f"First difference (page {i}): title {a.title!r} vs {b.title!r}, "
+                  f"{len(a.paragraphs)} vs {len(b.paragraphs)} paragraphs")
+            break
+
+
+if __name__ == "__main__":
+    # python benchmark_extraction.py [directory of saved .html pages]
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,102 @@
+import random
+import time
+
+from news_database import NewsDatabase, BATCH_CHUNK_SIZE
+from near_duplicate import near_duplicates, SimHashIndex
+
+# Session-local copy of the articles table: it shadows the real one for this
+# connection only and disappears on disconnect, so no stored data is touched
+TEMP_SCHEMA = """
+CREATE TEMP TABLE articles (
+    id SERIAL PRIMARY KEY,
+    hash VARCHAR(64) UNIQUE NOT NULL,
+    simhash BIGINT,
+    title TEXT NOT NULL,
+    article TEXT NOT NULL,
+    url TEXT NOT NULL,
+    source VARCHAR(255) NOT NULL,
+    category VARCHAR(50) NOT NULL DEFAULT 'General',
+    category_confidence DECIMAL(3, 2) DEFAULT 0.0,
+    matched_keywords JSONB DEFAULT '[]',
+    fetched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    word_count INTEGER,
+    sentiment_score DECIMAL(3, 2),
+    importance_score DECIMAL(3, 2),
+    why_it_matters TEXT
+)
+"""
+
+WORDS = ["market", "election", "research", "team", "software", "economy", "film", "vaccine", "the", "and"]
+
+
+def make_articles(count, duplicate_ratio=0.2, seed=42):
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        if articles and rng.random() < duplicate_ratio:
+            articles.append(dict(rng.choice(articles)))  # same text -> same hash
+            continue
+        articles.append({
+            "title": f"Benchmark article {i}",
+            "article": " ".join(rng.choice(WORDS) for _ in range(300)) + f" #{i}",
+            "url": f"https://example.com/news/{i}",
+            "source": "example.com",
+            "category": rng.choice(["Business", "Technology", "World"]),
+            "category_confidence": round(rng.random(), 2),
+            "matched_keywords": rng.sample(WORDS, 3),
+        })
+    return articles
+
+
+def reset_table(db):
+    db.cur.execute("DROP TABLE IF EXISTS pg_temp.articles")
+    db.cur.execute(TEMP_SCHEMA)
+    db.conn.commit()
+    near_duplicates.index = SimHashIndex()  # forget the articles indexed by the previous run
+
+
+def count_rows(db):
+    db.cur.execute("SELECT COUNT(*) FROM articles")
+    return db.cur.fetchone()[0]
+
+
+def run_benchmark(num_articles=500):
+    print(f"🚀 Article insert benchmark: {num_articles} articles (~20% duplicates)")
+    db = NewsDatabase()
+    if not db.cur:
+        print("❌ No database connection (set DATABASE_URL)")
+        return
+
+    articles = make_articles(num_articles)
+    try:
+        # 1. One INSERT + one commit per article
+        reset_table(db)
+        start = time.time()
+        single = [db.store_article(article) for article in articles]
+        single_time = time.time() - start
+        single_rows = count_rows(db)
+
+        # 2. Chunked multi-row INSERT ... RETURNING, one commit per chunk
+        reset_table(db)
+        start = time.time()
+        batch = db.store_articles_batch(articles)
+        batch_time = time.time() - start
+        batch_rows = count_rows(db)
+    finally:
+        db.close()
+
+    same_outcome = [is_new for _, is_new in single] == [is_new for _, is_new in batch]
+    chunks = -(-num_articles // BATCH_CHUNK_SIZE)
+
+    print("\n════════════════════════════════════")
+    print("      ARTICLE INSERT RESULTS        ")
+    print("════════════════════════════════════")
+    print(f"Per-article:  {single_time:.2f}s  ({2 * num_articles} round trips, {single_rows} rows)")
+    print(f"Bulk:         {batch_time:.2f}s  ({2 * chunks} round trips, {batch_rows} rows)")
+    print(f"Speedup:      {single_time / max(batch_time, 1e-9):.1f}x")
+    print(f"Same new/duplicate outcome per article: {'✅' if same_outcome else '❌'}")
+    print("════════════════════════════════════")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,89 @@
+import random
+import time
+
+import numpy as np
+
+from zenith_scoring import (calculate_zenith_score, calculate_stock_score, crypto_columns,
+                            score_crypto, score_pairs, score_stocks, score_stock_rows)
+
+
+def random_pair(rng):
+    # Values cluster around the thresholds so every branch is exercised
+    def change():
+        return rng.choice([rng.uniform(-30, 30), rng.choice([0, 5, 10, 15, -2, 0.0]), rng.uniform(-1, 1)])
+
+    pair = {
+        "priceChange": {"h1": change(), "h6": change(), "h24": change()},
+        "liquidity": {"usd": rng.choice([0, 1000, 50000, rng.uniform(0, 5_000_000)])},
+        "volume": {"h24": rng.choice([0, 100000, rng.uniform(0, 10_000_000)])},
+    }
+    roll = rng.random()
+    if roll < 0.02:
+        pair["priceChange"]["h1"] = "n/a"      # scalar version rejects -> 0.0
+    elif roll < 0.04:
+        pair["priceChange"]["h6"] = str(pair["priceChange"]["h6"])  # numeric string is accepted
+    elif roll < 0.05:
+        del pair["volume"]
+    return pair
+
+
+def random_stock(rng):
+    avg = rng.choice([1, 1000, rng.uniform(1, 5_000_000)])
+    stock = {
+        "changesPercentage": rng.choice([rng.uniform(-10, 10), 0, 2, 5, -2]),
+        "volume": rng.choice([avg, avg * 1.5, rng.uniform(0, 10_000_000), int(avg) + 1]),
+        "avgVolume": avg,
+    }
+    if rng.random() < 0.02:
+        stock["changesPercentage"] = None      # scalar version rejects -> 50.0
+    return stock
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(num_rows=100_000, seed=7):
+    print(f"🚀 Zenith scoring benchmark: {num_rows:,} rows")
+    rng = random.Random(seed)
+    pairs = [random_pair(rng) for _ in range(num_rows)]
+    stocks = [random_stock(rng) for _ in range(num_rows)]
+
+    # 1. Crypto
+    scalar, scalar_time = timed(lambda: [calculate_zenith_score(p) for p in pairs])
+    batch, batch_time = timed(score_pairs, pairs)
+    columns, valid = crypto_columns(pairs)
+    _, column_time = timed(score_crypto, *columns.T)
+    crypto_ok = scalar == batch
+
+    # 2. Stocks
+    stock_scalar, stock_scalar_time = timed(lambda: [calculate_stock_score(s) for s in stocks])
+    stock_batch, stock_batch_time = timed(score_stock_rows, stocks)
+    stock_columns = np.array([[s["changesPercentage"] or 0, s["volume"], s["avgVolume"]] for s in stocks],
+                             dtype=np.float64)
+    _, stock_column_time = timed(score_stocks, *stock_columns.T)
+    stocks_ok = stock_scalar == stock_batch
+
+    print("\n════════════════════════════════════")
+    print("      SCORING BENCHMARK RESULTS     ")
+    print("════════════════════════════════════")
+    print(f"Crypto scalar:       {num_rows / scalar_time:>14,.0f} rows/sec")
+    print(f"Crypto dicts->numpy: {num_rows / batch_time:>14,.0f} rows/sec")
+    print(f"Crypto columns only: {num_rows / column_time:>14,.0f} rows/sec")
+    print(f"Crypto identical:    {'✅' if crypto_ok else '❌'}")
+    print(f"Stock scalar:        {num_rows / stock_scalar_time:>14,.0f} rows/sec")
+    print(f"Stock dicts->numpy:  {num_rows / stock_batch_time:>14,.0f} rows/sec")
+    print(f"Stock columns only:  {num_rows / stock_column_time:>14,.0f} rows/sec")
+    print(f"Stock identical:     {'✅' if stocks_ok else '❌'}")
+    print("════════════════════════════════════")
+
+    if not (crypto_ok and stocks_ok):
+        mismatches = [i for i, (a, b) in enumerate(zip(scalar, batch)) if a != b][:5]
+        print(f"First crypto mismatches: {[(pairs[i], scalar[i], batch[i]) for i in mismatches]}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_benchmark()
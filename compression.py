@@ -0,0 +1,76 @@
+"""
+🗜️ RESPONSE COMPRESSION
+Accept-Encoding negotiation (brotli > gzip) and body compression
+Live responses use fast levels; bodies stored in response_cache are compressed
+once at a higher level and served as-is on every hit
+"""
+
+import gzip
+from typing import Dict, Optional
+
+# Brotli - Made resilient
+BROTLI_AVAILABLE = False
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+MIN_SIZE = 1024  # below this the headers cost more than they save
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/x-ndjson")
+
+# Per-request compression runs on the event loop - keep it cheap
+LIVE_LEVELS = {"br": 4, "gzip": 5}
+# Cached bodies are compressed once and served many times - spend the CPU
+STORED_LEVELS = {"br": 9, "gzip": 9}
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best encoding the client accepts (q=0 means refused)"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():  # server preference breaks ties
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: Optional[str], size: int) -> bool:
+    return size >= MIN_SIZE and bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, levels: Dict[str, int] = LIVE_LEVELS) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=levels["br"])
+    # mtime=0 keeps output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=levels["gzip"], mtime=0)
+
+
+def precompress(body: bytes, content_type: Optional[str]) -> Dict[str, bytes]:
+    """All stored variants of a body worth compressing; empty when it isn't"""
+    if not is_compressible(content_type, len(body)):
+        return {}
+    return {encoding: compress(body, encoding, STORED_LEVELS) for encoding in supported_encodings()}
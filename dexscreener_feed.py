@@ -0,0 +1,156 @@
+"""
+🦎 DEXSCREENER TOKEN FEED
+Background-refreshed index of scored DEX tokens for /api/v1/tokens/scored
+- Fans the search queries out concurrently (through the upstream scheduler)
+- Merges pairs as they arrive, one entry per chain + token address (most liquid pair wins)
+- Scores the merged universe in one batch call (zenith_scoring.score_pairs)
+- Upserts the result into a TokenIndex (token_index.py); tokens missing from refreshes age out
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from token_index import TokenIndex
+from upstream_scheduler import upstream, Priority
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+SEARCH_QUERIES = [
+    "uniswap eth", "pancakeswap bsc", "raydium solana",
+    "quickswap polygon", "sushiswap", "trader joe avax",
+    "jupiter solana", "orca solana", "camelot arbitrum"
+]
+SEARCH_URL = "https://api.dexscreener.com/latest/dex/search?q={}"
+
+REFRESH_INTERVAL = 120   # seconds between background refreshes
+STALE_AFTER = 600        # an index older than this triggers an immediate refresh
+MIN_LIQUIDITY_FLOOR = 1000  # pairs below this are never kept; request filters apply on top
+COLD_START_WAIT = 8.0    # first request after boot waits at most this long for data
+EXPIRE_AFTER = 600       # tokens no refresh has returned for this long are dropped
+
+
+def pair_key(pair: dict) -> Optional[Tuple[str, str]]:
+    token = pair.get('baseToken') or {}
+    address = token.get('address')
+    if not address:
+        return None
+    return (pair.get('chainId', 'ethereum'), address.lower())
+
+
+class TokenFeed:
+    """Holds the token index and the refresher that keeps it current"""
+
+    def __init__(self, score: Callable[[List[dict]], List[float]], queries: List[str] = SEARCH_QUERIES,
+                 interval: float = REFRESH_INTERVAL):
+        self.score = score
+        self.queries = queries
+        self.interval = interval
+        self.index = TokenIndex()
+        self.refresh_lock = threading.Lock()
+        self.thread_lock = threading.Lock()
+        self.first_load = threading.Event()
+        self._thread = None
+
+    # ─────────────────────────────────────────────────────
+    # READS
+    # ─────────────────────────────────────────────────────
+
+    def current(self) -> TokenIndex:
+        """The live index. Never refreshes inline except to wait (bounded) for the very first load."""
+        self.ensure_refresher()
+        if not self.first_load.is_set():
+            self.first_load.wait(timeout=COLD_START_WAIT)
+        elif time.time() - self.index.refreshed_at > STALE_AFTER:
+            threading.Thread(target=self.refresh, name="dexscreener-refresh", daemon=True).start()
+        return self.index
+
+    # ─────────────────────────────────────────────────────
+    # REFRESH
+    # ─────────────────────────────────────────────────────
+
+    def refresh(self) -> int:
+        """Fetch all queries concurrently, merge, score and upsert. Returns the token count."""
+        if not self.refresh_lock.acquire(blocking=False):
+            return len(self.index)  # a refresh is already running
+        try:
+            started = time.time()
+            best: Dict[Tuple[str, str], dict] = {}
+            with ThreadPoolExecutor(max_workers=len(self.queries), thread_name_prefix="dexscreener") as pool:
+                futures = [
+                    pool.submit(upstream.fetch, "dexscreener", SEARCH_URL.format(q),
+                                Priority.BACKGROUND, ttl=self.interval / 2)
+                    for q in self.queries
+                ]
+                # Merge each response as soon as it lands
+                for future in as_completed(futures):
+                    data = future.result() or {}
+                    for pair in data.get('pairs') or []:
+                        self._merge(best, pair)
+
+            if not best:
+                print("⚠️ DexScreener refresh returned nothing - keeping current index")
+                return len(self.index)
+
+            pairs = list(best.values())
+            tokens = [self._token(pair, score) for pair, score in zip(pairs, self.score(pairs))]
+            changed = self.index.upsert_many(tokens)
+            expired = self.index.expire(time.time() - EXPIRE_AFTER)
+            print(f"🦎 DexScreener feed: {len(tokens)} tokens ({changed} changed, {expired} expired) "
+                  f"in {time.time() - started:.1f}s")
+            return len(self.index)
+        finally:
+            self.first_load.set()
+            self.refresh_lock.release()
+
+    def _merge(self, best: Dict[Tuple[str, str], dict], pair: dict):
+        if not pair.get('liquidity') or not pair.get('volume'):
+            return
+        key = pair_key(pair)
+        if key is None:
+            return
+        liquidity = pair['liquidity'].get('usd') or 0
+        if liquidity < MIN_LIQUIDITY_FLOOR:
+            return
+        current = best.get(key)
+        if current is None or liquidity > (current['liquidity'].get('usd') or 0):
+            best[key] = pair
+
+    def _token(self, pair: dict, score: float) -> dict:
+        base = pair['baseToken']
+        return {
+            "symbol": base.get('symbol', 'UNKNOWN'),
+            "name": base.get('name', 'Unknown Token'),
+            "address": base.get('address'),
+            "chain": pair.get('chainId', 'ethereum'),
+            "price_usd": float(pair.get('priceUsd') or 0),
+            "liquidity_usd": pair['liquidity'].get('usd') or 0,
+            "volume_24h": pair['volume'].get('h24') or 0,
+            "price_change_24h": (pair.get('priceChange') or {}).get('h24', 0),
+            "zenith_score": score,
+            "url": pair.get('url')
+        }
+
+    # ─────────────────────────────────────────────────────
+    # BACKGROUND LOOP
+    # ─────────────────────────────────────────────────────
+
+    def ensure_refresher(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self.thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name="dexscreener-feed", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ DexScreener refresh failed: {e}")
+            time.sleep(self.interval)
@@ -1,12 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
+from requests.compat import chardet
 from urllib.parse import urlparse
-import re
+from keyword_matcher import KeywordMatcher
+from html_extract import extract
+from http_cache import page_cache
 
 HEADERS = {
     "User-Agent": "NewsSignalBot/1.0 (respectful)"
 }
 
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # pages are truncated past this
+
 # 🏷️ CATEGORY KEYWORDS (extensible)
 CATEGORY_KEYWORDS = {
     "Technology": [
@@ -64,6 +67,9 @@ CATEGORY_KEYWORDS = {
     ]
 }
 
+# One matcher over every category keyword, built at import
+CATEGORY_MATCHER = KeywordMatcher(kw for keywords in CATEGORY_KEYWORDS.values() for kw in keywords)
+
 # 🌐 DOMAIN-BASED CATEGORY HINTS
 # Known news domains with their primary categories
 DOMAIN_HINTS = {
@@ -102,14 +108,15 @@ def detect_category(title, article_text, url=None, source=None):
     
     category_scores = {}
     
-    # 1️⃣ Keyword-based scoring
+    # 1️⃣ Keyword-based scoring (every keyword counted in one pass over the text)
+    keyword_counts = CATEGORY_MATCHER.count(combined_text)
     for category, keywords in CATEGORY_KEYWORDS.items():
         score = 0
         matched_keywords = []
         
         for keyword in keywords:
             # Count occurrences of each keyword
-            count = len(re.findall(r'\b' + re.escape(keyword.lower()) + r'\b', combined_text))
+            count = keyword_counts.get(keyword.lower(), 0)
             if count > 0:
                 score += count
                 matched_keywords.append(keyword)
@@ -165,35 +172,37 @@ def detect_category(title, article_text, url=None, source=None):
     return category_name, confidence, matched_keywords
 
 
+def fetch_page(url):
+    """
+    Fetch stage: download a page (network-bound) through the HTTP cache. Returns its HTML.
+    Reads at most MAX_RESPONSE_BYTES from the socket - article text is near the top.
+    """
+    response = page_cache.fetch(url, session="scraper", headers=HEADERS, timeout=15,
+                                max_bytes=MAX_RESPONSE_BYTES)
+    response.raise_for_status(url)
+    body = response.body
+    # Decode exactly like response.text would
+    encoding = response.encoding or chardet.detect(body)["encoding"]
+    try:
+        return str(body, encoding or "utf-8", errors="replace")
+    except (LookupError, TypeError):
+        return str(body, errors="replace")
+
+
 def scrape_article(url):
     """
-    Enhanced article scraper with category detection.
+    Enhanced article scraper with category detection (fetch + classify in one call).
+    """
+    return classify_page(url, fetch_page(url))
+
+
+def classify_page(url, html, backend=None):
+    """
+    Classify stage: parse fetched HTML, extract the article and detect its category (CPU-bound).
     """
-    # 1️⃣ Fetch
-    response = requests.get(url, headers=HEADERS, timeout=15)
-    response.raise_for_status()
-    html = response.text
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    # 2️⃣ TITLE (try h1 first, fallback to title tag)
-    title = None
-    if soup.find("h1"):
-        title = soup.find("h1").get_text(strip=True)
-    elif soup.title:
-        title = soup.title.get_text(strip=True)
-    else:
-        title = "Unknown Title"
-
-    # 3️⃣ ARTICLE TEXT (generic approach)
-    paragraphs = []
-
-    for p in soup.find_all("p"):
-        text = p.get_text(strip=True)
-        if len(text) > 50:  # ignore nav / junk
-            paragraphs.append(text)
-
-    article_text = " ".join(paragraphs[:40])  # limit size
+    # 2️⃣ TITLE + 3️⃣ ARTICLE TEXT (html_extract backend: lxml when installed, else BeautifulSoup)
+    title, paragraphs = extract(html, backend)
+    article_text = " ".join(paragraphs)  # already limited to MAX_PARAGRAPHS
 
     # 4️⃣ SOURCE (domain)
     source = urlparse(url).netloc.replace("www.", "")
@@ -0,0 +1,78 @@
+"""
+⚡ FAST JSON
+orjson-backed encoding for HTTP responses and WebSocket messages
+Endpoints that return FastJSONResponse directly skip FastAPI's jsonable_encoder
+pass; falls back to the stdlib encoder when orjson isn't installed
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, List
+
+from fastapi.responses import JSONResponse, Response
+
+# orjson - Made resilient
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any):
+    """Types psycopg2 rows hand us that neither encoder handles natively"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+if ORJSON_AVAILABLE:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_str(obj: Any) -> str:
+    """Text-frame payload for WebSocket.send_text"""
+    return dumps(obj).decode("utf-8")
+
+
+# ═══════════════════════════════════════════════════════
+# PRE-SERIALIZED PAYLOADS
+# ═══════════════════════════════════════════════════════
+
+def encode_items(items: Iterable[Any]) -> List[bytes]:
+    """Serialize list items one by one so slices of a cached list can be re-emitted without re-encoding"""
+    return [dumps(item) for item in items]
+
+
+def envelope(items: List[bytes], **fields) -> bytes:
+    """{**fields, "data": [...items]} built around already-encoded items"""
+    head = dumps(fields)[:-1]
+    if fields:
+        head += b","
+    return head + b'"data":[' + b",".join(items) + b"]}"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (or the stdlib fallback)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Body that is already encoded JSON bytes"""
+    media_type = "application/json"
@@ -0,0 +1,107 @@
+"""
+🧾 HTML EXTRACTION
+Pluggable backends that pull the title and article paragraphs out of a page
+- "bs4":  BeautifulSoup + html.parser, the original full-tree implementation (reference)
+- "lxml": libxml2 pull parser fed in chunks; stops as soon as the result can no longer
+          change (MAX_PARAGRAPHS qualifying <p> collected and an <h1> seen)
+Both return the same Extracted shape; scrape_article joins the paragraphs.
+"""
+
+import os
+from typing import Callable, Dict, List, NamedTuple
+
+from bs4 import BeautifulSoup
+
+# lxml - Made resilient
+LXML_AVAILABLE = False
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    etree = None
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+MAX_PARAGRAPHS = 40      # paragraphs kept per article
+MIN_PARAGRAPH_LEN = 50   # shorter <p> are nav / junk
+FEED_CHUNK = 64 * 1024   # characters handed to the pull parser at a time
+
+
+class Extracted(NamedTuple):
+    title: str
+    paragraphs: List[str]
+
+
+def _joined_text(pieces) -> str:
+    """BeautifulSoup get_text(strip=True): every text piece stripped, empties dropped, no separator"""
+    return "".join(piece.strip() for piece in pieces if piece and piece.strip())
+
+
+# ═══════════════════════════════════════════════════════
+# BACKENDS
+# ═══════════════════════════════════════════════════════
+
+def extract_bs4(html: str) -> Extracted:
+    soup = BeautifulSoup(html, "html.parser")
+
+    # TITLE (try h1 first, fallback to title tag)
+    h1 = soup.find("h1")
+    if h1:
+        title = h1.get_text(strip=True)
+    elif soup.title:
+        title = soup.title.get_text(strip=True)
+    else:
+        title = "Unknown Title"
+
+    paragraphs = []
+    for p in soup.find_all("p"):
+        text = p.get_text(strip=True)
+        if len(text) > MIN_PARAGRAPH_LEN:  # ignore nav / junk
+            paragraphs.append(text)
+    return Extracted(title, paragraphs[:MAX_PARAGRAPHS])
+
+
+def extract_lxml(html: str) -> Extracted:
+    parser = etree.HTMLPullParser(events=("end",), tag=("h1", "title", "p"))
+    found = {}  # "h1" / "title" -> text of the first such element
+    paragraphs = []
+
+    def consume(events):
+        for _, element in events:
+            if element.tag == "p":
+                if len(paragraphs) < MAX_PARAGRAPHS:
+                    text = _joined_text(element.itertext())
+                    if len(text) > MIN_PARAGRAPH_LEN:
+                        paragraphs.append(text)
+            elif element.tag not in found:
+                found[element.tag] = _joined_text(element.itertext())
+
+    for offset in range(0, len(html), FEED_CHUNK):
+        parser.feed(html[offset:offset + FEED_CHUNK])
+        consume(parser.read_events())
+        # Nothing later in the page can change the result
+        if "h1" in found and len(paragraphs) >= MAX_PARAGRAPHS:
+            break
+    else:
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass  # empty or unparseable document
+        consume(parser.read_events())
+
+    # TITLE (h1 first, fallback to title tag)
+    title = found.get("h1", found.get("title", "Unknown Title"))
+    return Extracted(title, paragraphs)
+
+
+BACKENDS: Dict[str, Callable[[str], Extracted]] = {"bs4": extract_bs4}
+if LXML_AVAILABLE:
+    BACKENDS["lxml"] = extract_lxml
+
+DEFAULT_BACKEND = os.getenv("HTML_EXTRACT_BACKEND") or ("lxml" if LXML_AVAILABLE else "bs4")
+
+
+def extract(html: str, backend: str = None) -> Extracted:
+    return BACKENDS.get(backend or DEFAULT_BACKEND, extract_bs4)(html)
@@ -0,0 +1,263 @@
+"""
+🗃️ HTTP CACHE
+On-disk cache for scraped pages and RSS feeds, keyed by URL
+- Honors Cache-Control (max-age / no-cache / no-store), Expires, ETag and Last-Modified:
+  fresh entries cost no request, stale ones are revalidated with a conditional GET (304 = no body)
+- Compact storage: one SQLite file, zlib-compressed bodies, index pages memory-mapped
+- Size-bounded: least recently used entries are evicted past HTTP_CACHE_MAX_MB
+- HTTP_CACHE_MODE: "on" (default), "record" (store every 200, even no-store - for building a
+  development corpus), "offline" (serve only from the cache, never touch the network), "off"
+"""
+
+import email.utils
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from requests.utils import get_encoding_from_headers
+
+from http_session import get_session
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "on").lower()
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH") or os.path.join(tempfile.gettempdir(), "zenith_http_cache.sqlite3")
+HTTP_CACHE_MAX_BYTES = int(float(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+MMAP_BYTES = 64 * 1024 * 1024      # SQLite maps this much of the file instead of read() calls
+COMPRESS_LEVEL = 6
+HEURISTIC_FRACTION = 0.1           # no explicit lifetime: fresh for 10% of the page's age...
+HEURISTIC_MAX = 24 * 3600          # ...capped at a day (RFC 9111 §4.2.2)
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires", "date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,          -- blake2b-128 of the URL
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,         -- JSON of KEPT_HEADERS
+    body BLOB NOT NULL,            -- zlib
+    size INTEGER NOT NULL,         -- stored (compressed) bytes
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses(last_access);
+"""
+
+
+class OfflineMiss(requests.RequestException):
+    """Offline mode and the URL has never been cached"""
+
+
+class HttpResult(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    from_cache: bool
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """What requests' Response.encoding would be for these headers"""
+        return get_encoding_from_headers(self.headers)
+
+    def raise_for_status(self, url: str):
+        if self.status >= 400:
+            raise requests.HTTPError(f"{self.status} Error for url: {url}")
+
+
+def _cache_key(url: str) -> bytes:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_directives(headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float) -> float:
+    """Seconds a response stays fresh: max-age, then Expires, then the Last-Modified heuristic"""
+    directives = _cache_directives(headers)
+    if "no-cache" in directives:
+        return 0.0
+    if directives.get("max-age"):
+        try:
+            return max(0.0, float(directives["max-age"]))
+        except ValueError:
+            return 0.0
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        return max(0.0, expires - (_http_date(headers.get("date")) or now))
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        return min(HEURISTIC_MAX, max(0.0, (now - last_modified) * HEURISTIC_FRACTION))
+    return 0.0
+
+
+class HttpCache:
+    """URL -> last 200 response; one SQLite connection per thread"""
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 mode: str = HTTP_CACHE_MODE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.local = threading.local()
+        self.evict_lock = threading.Lock()
+        self.stats = {"fresh": 0, "revalidated": 0, "fetched": 0, "offline": 0}
+        if mode != "off":
+            try:
+                self._db().executescript(SCHEMA)
+            except sqlite3.Error as e:
+                print(f"⚠️ HTTP cache disabled ({path}): {e}")
+                self.mode = "off"
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            self.local.db = db
+        return db
+
+    # ─────────────────────────────────────────────────────
+    # FETCH
+    # ─────────────────────────────────────────────────────
+
+    def fetch(self, url: str, session: str = "scraper", headers: Optional[Dict[str, str]] = None,
+              timeout: float = 15, max_bytes: Optional[int] = None) -> HttpResult:
+        """GET through the cache. Bodies are read from the socket up to max_bytes."""
+        if self.mode == "off":
+            return self._download(url, session, headers, timeout, max_bytes)
+
+        now = time.time()
+        cached = self._load(url, now)
+        if cached is not None and (self.mode == "offline" or now < cached[1]):
+            self.stats["offline" if self.mode == "offline" else "fresh"] += 1
+            return cached[0]
+        if self.mode == "offline":
+            raise OfflineMiss(f"Not in HTTP cache (offline mode): {url}")
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if cached[0].headers.get("etag"):
+                request_headers["If-None-Match"] = cached[0].headers["etag"]
+            if cached[0].headers.get("last-modified"):
+                request_headers["If-Modified-Since"] = cached[0].headers["last-modified"]
+
+        result = self._download(url, session, request_headers, timeout, max_bytes)
+        if result.status == 304 and cached is not None:
+            self.stats["revalidated"] += 1
+            merged = {**cached[0].headers, **{k: v for k, v in result.headers.items() if k in KEPT_HEADERS}}
+            self._touch(url, merged, now)
+            return cached[0]._replace(headers=merged)
+
+        self.stats["fetched"] += 1
+        if result.status == 200 and self._storable(result.headers):
+            self._store(url, result, now)
+        return result
+
+    def _storable(self, headers: Dict[str, str]) -> bool:
+        return self.mode == "record" or "no-store" not in _cache_directives(headers)
+
+    @staticmethod
+    def _download(url, session, headers, timeout, max_bytes) -> HttpResult:
+        with get_session(session).get(url, headers=headers, timeout=timeout, stream=True) as response:
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if max_bytes and len(body) >= max_bytes:
+                    del body[max_bytes:]
+                    break
+            kept = {k: v for k, v in ((k, response.headers.get(k)) for k in KEPT_HEADERS) if v}
+            return HttpResult(response.status_code, kept, bytes(body), False)
+
+    # ─────────────────────────────────────────────────────
+    # STORE
+    # ─────────────────────────────────────────────────────
+
+    def _load(self, url: str, now: float):
+        """(HttpResult, expires_at) or None"""
+        try:
+            row = self._db().execute(
+                "SELECT headers, body, expires_at FROM responses WHERE key = ?", (_cache_key(url),)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db().execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, _cache_key(url)))
+            return HttpResult(200, json.loads(row[0]), zlib.decompress(row[1]), True), row[2]
+        except (sqlite3.Error, zlib.error) as e:
+            print(f"⚠️ HTTP cache read failed: {e}")
+            return None
+
+    def _store(self, url: str, result: HttpResult, now: float):
+        body = zlib.compress(result.body, COMPRESS_LEVEL)
+        expires_at = now + freshness_lifetime(result.headers, now)
+        try:
+            self._db().execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (_cache_key(url), url, json.dumps(result.headers), body, len(body), now, expires_at, now),
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ HTTP cache write failed: {e}")
+            return
+        self._evict()
+
+    def _touch(self, url: str, headers: Dict[str, str], now: float):
+        try:
+            self._db().execute(
+                "UPDATE responses SET headers = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(headers), now + freshness_lifetime(headers, now), now, _cache_key(url)),
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ HTTP cache write failed: {e}")
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its budget"""
+        if not self.evict_lock.acquire(blocking=False):
+            return  # another thread is already evicting
+        try:
+            db = self._db()
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = total - int(self.max_bytes * 0.9)
+            freed = 0
+            doomed = []
+            for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                doomed.append((key,))
+                freed += size
+                if freed >= target:
+                    break
+            db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        except sqlite3.Error as e:
+            print(f"⚠️ HTTP cache eviction failed: {e}")
+        finally:
+            self.evict_lock.release()
+
+
+# Shared by the scraper and RSS discovery
+page_cache = HttpCache()
@@ -0,0 +1,94 @@
+"""
+🔌 HTTP SESSIONS
+Shared requests sessions so repeated calls reuse TCP + TLS connections
+- One session per purpose ("scraper", "feeds", "market"), created on first use
+- Keep-alive pools sized per host: a host gets as many pooled connections as we
+  allow concurrent requests to it (see scrape_stage / upstream_scheduler limits)
+- Retry with exponential backoff for idempotent requests (connect errors, 5xx)
+"""
+
+import threading
+from typing import Dict, NamedTuple, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+BOT_HEADERS = {"User-Agent": "NewsSignalBot/1.0 (respectful)"}
+
+
+class SessionProfile(NamedTuple):
+    pool_size: int                         # pooled connections per host (default)
+    host_pools: Dict[str, int] = {}        # URL prefix -> pooled connections for that host
+    hosts: int = 32                        # distinct hosts kept in the pool cache
+    retries: int = 2                       # total retries (connect + read + status)
+    read_retries: int = 1                  # after the request was sent (read timeouts double latency)
+    backoff: float = 0.5                   # sleeps backoff * 2**(n-1) between retries
+    retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+    headers: Dict[str, str] = {}
+
+
+SESSION_PROFILES: Dict[str, SessionProfile] = {
+    # Article pages: many hosts, 2 in flight per host (news.google.com redirects get 8)
+    "scraper": SessionProfile(2, {"https://news.google.com/": 8}, hosts=128, headers=BOT_HEADERS),
+    # Google News RSS: one host, all feeds fetched at once
+    "feeds": SessionProfile(16, hosts=4, headers=BOT_HEADERS),
+    # Market data: pools follow each provider's burst. The upstream scheduler owns
+    # deadlines, hedging and 429 handling, so only a stale pooled connection is retried.
+    "market": SessionProfile(8, {
+        "https://api.dexscreener.com/": 30,
+        "https://api.coingecko.com/": 10,
+        "https://www.alphavantage.co/": 5,
+    }, hosts=8, retries=1, read_retries=0, backoff=0.0, retry_statuses=()),
+}
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _adapter(profile: SessionProfile, pool_size: int) -> HTTPAdapter:
+    retry = Retry(
+        total=profile.retries,
+        connect=profile.retries,
+        read=profile.read_retries,
+        status=profile.retries,
+        backoff_factor=profile.backoff,
+        status_forcelist=profile.retry_statuses,
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        raise_on_status=False,  # hand the last response back; callers check status themselves
+    )
+    return HTTPAdapter(pool_connections=profile.hosts, pool_maxsize=pool_size, max_retries=retry)
+
+
+def build_session(profile: SessionProfile) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(profile.headers)
+    default = _adapter(profile, profile.pool_size)
+    session.mount("https://", default)
+    session.mount("http://", default)
+    # Longest prefix wins in requests, so host-specific adapters override the default
+    for prefix, size in profile.host_pools.items():
+        session.mount(prefix, _adapter(profile, size))
+    return session
+
+
+def get_session(name: str) -> requests.Session:
+    """Process-wide session for a profile in SESSION_PROFILES (thread-safe for GETs)"""
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = build_session(SESSION_PROFILES[name])
+    return session
+
+
+def close_sessions():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
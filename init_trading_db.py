@@ -8,6 +8,8 @@ import os
 import psycopg2
 from dotenv import load_dotenv
 
+from quota_ledger import QUOTA_SCHEMA
+
 load_dotenv()
 
 def get_connection():
@@ -54,6 +56,7 @@ CREATE TABLE IF NOT EXISTS trading_users (
 
 CREATE INDEX IF NOT EXISTS idx_trading_users_session ON trading_users(session_id);
 CREATE INDEX IF NOT EXISTS idx_trading_users_portfolio ON trading_users(portfolio_value DESC);
+CREATE INDEX IF NOT EXISTS idx_trading_users_last_active ON trading_users(last_active);
 
 -- ═══════════════════════════════════════════════════════
 -- TRADING ASSETS TABLE
@@ -138,6 +141,8 @@ CREATE TABLE IF NOT EXISTS trading_trades (
 CREATE INDEX IF NOT EXISTS idx_trading_trades_user ON trading_trades(user_id);
 CREATE INDEX IF NOT EXISTS idx_trading_trades_time ON trading_trades(executed_at DESC);
 CREATE INDEX IF NOT EXISTS idx_trading_trades_status ON trading_trades(status);
+-- Keyset pagination of a user's history: WHERE user_id = ? AND (executed_at, id) < (?, ?)
+CREATE INDEX IF NOT EXISTS idx_trading_trades_user_time ON trading_trades(user_id, executed_at DESC, id DESC);
 
 -- ═══════════════════════════════════════════════════════
 -- PENDING ORDERS TABLE
@@ -184,6 +189,10 @@ CREATE TABLE IF NOT EXISTS trading_portfolio_history (
 );
 
 CREATE INDEX IF NOT EXISTS idx_portfolio_history_user_time ON trading_portfolio_history(user_id, recorded_at DESC);
+
+-- Benchmark prices at snapshot time (beta vs BTC/SPX in portfolio_analytics.py)
+ALTER TABLE trading_portfolio_history ADD COLUMN IF NOT EXISTS btc_price NUMERIC(20,8);
+ALTER TABLE trading_portfolio_history ADD COLUMN IF NOT EXISTS spx_price NUMERIC(20,8);
 """
 
 DEFAULT_ASSETS = [
@@ -216,6 +225,7 @@ def init_trading_db():
         
         # Create tables
         cur.execute(TRADING_SCHEMA)
+        cur.execute(QUOTA_SCHEMA)  # daily AI request counters, defined with quota_ledger.py
         conn.commit()
         print("✅ Tables created successfully")
         
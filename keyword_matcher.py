@@ -0,0 +1,63 @@
+"""
+🔑 KEYWORD MATCHER
+Counts every keyword of a fixed vocabulary in one pass over a text
+- Equivalent to len(re.findall(r'\\b' + re.escape(keyword) + r'\\b', text)) for each keyword,
+  including overlaps between different keywords ("health" inside "mental health")
+- Keywords made of word characters separated by single spaces are matched on word tokens
+  (dictionary lookups); anything else falls back to its own compiled regex
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+WORD = re.compile(r"\w+")
+TOKEN_KEYWORD = re.compile(r"\w+( \w+)*")
+
+
+class KeywordMatcher:
+    """Built once from a keyword vocabulary; count() is safe to call from any thread"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keyword.lower() for keyword in keywords))
+        self.single: Dict[str, str] = {}                         # token -> keyword
+        self.multi: Dict[str, List[Tuple[str, ...]]] = {}        # first token -> keyword token tuples
+        self.fallback: List[Tuple[str, "re.Pattern"]] = []       # (keyword, pattern)
+        for keyword in self.keywords:
+            if not TOKEN_KEYWORD.fullmatch(keyword):
+                self.fallback.append((keyword, re.compile(r"\b" + re.escape(keyword) + r"\b")))
+            elif " " in keyword:
+                parts = tuple(keyword.split(" "))
+                self.multi.setdefault(parts[0], []).append(parts)
+            else:
+                self.single[keyword] = keyword
+
+    def count(self, text: str) -> Counter:
+        """keyword -> number of non-overlapping whole-word occurrences (only keywords found)"""
+        counts = Counter()
+        tokens = [(m.group(), m.start(), m.end()) for m in WORD.finditer(text)]
+        next_free: Dict[Tuple[str, ...], int] = {}  # a keyword's own matches never overlap (findall)
+
+        for i, (token, _, end) in enumerate(tokens):
+            keyword = self.single.get(token)
+            if keyword is not None:
+                counts[keyword] += 1
+            for parts in self.multi.get(token, ()):
+                if i < next_free.get(parts, 0) or i + len(parts) > len(tokens):
+                    continue
+                prev_end = end
+                for j in range(1, len(parts)):
+                    word, start, word_end = tokens[i + j]
+                    # exactly one space between the words, as in the keyword itself
+                    if word != parts[j] or start != prev_end + 1 or text[prev_end] != " ":
+                        break
+                    prev_end = word_end
+                else:
+                    counts[" ".join(parts)] += 1
+                    next_free[parts] = i + len(parts)
+
+        for keyword, pattern in self.fallback:
+            found = len(pattern.findall(text))
+            if found:
+                counts[keyword] = found
+        return counts
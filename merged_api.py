@@ -7,19 +7,24 @@ FastAPI backend serving:
 
 from fastapi import FastAPI, HTTPException, Query, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, List, Set, Dict
 from datetime import datetime, timedelta
+from decimal import Decimal
 import os
+import io
+import csv
 import time
 import json
 import asyncio
+import threading
 import requests
-import collections
+from collections import OrderedDict
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi import Request
+from fast_json import FastJSONResponse, RawJSONResponse, dumps_str, envelope
 
 # Database Imports - Made resilient for serverless
 NEWS_DB_AVAILABLE = False
@@ -59,10 +64,15 @@ except ImportError as e:
 
 import uuid
 
+from upstream_scheduler import upstream, Priority
+from zenith_scoring import calculate_zenith_score, calculate_stock_score, calculate_forex_score, score_pairs, score_stock_rows
+from dexscreener_feed import TokenFeed
+from token_index import SORT_FIELDS
+
 # Trading Engine Import (Optional fallback)
 TRADING_ENGINE_AVAILABLE = False
 try:
-    from trading_engine import TradingEngine, TradeRequest, TradeResponse, get_asset_price
+    from trading_engine import TradingEngine, TradeRequest, TradeResponse, get_asset_price, activity
     TRADING_ENGINE_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ Trading engine module not available: {e}")
@@ -208,68 +218,169 @@ def get_db():
 app = FastAPI(
     title="Unified DeFi Oracle API",
     description="Combined News Signal & Zenith Scores API",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=FastJSONResponse
 )
 
-# CORS Configuration
-ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
-if not ALLOWED_ORIGINS or ALLOWED_ORIGINS == [""]:
-    ALLOWED_ORIGINS = ["*"]
+# ═══════════════════════════════════════════════════════
+# RESPONSE CACHE (ETag / 304 for hot read endpoints)
+# ═══════════════════════════════════════════════════════
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Registered before the rate limiter so cached hits still count against limits
+RESPONSE_CACHE_AVAILABLE = False
+try:
+    from response_cache import ResponseCache, NO_STORE
+    response_cache = ResponseCache()
+    RESPONSE_CACHE_AVAILABLE = True
+except ImportError as e:
+    NO_STORE = {"Cache-Control": "no-store"}
+    print(f"⚠️ Response cache not available: {e}")
+
+@app.middleware("http")
+async def response_cache_middleware(request: Request, call_next):
+    policy = response_cache.policy_for(request) if RESPONSE_CACHE_AVAILABLE else None
+    if policy is None:
+        return await call_next(request)
+    
+    tier = "free"
+    if policy.vary_tier:
+        tier, _ = await get_request_tier(request)
+    return await response_cache.serve(request, call_next, policy, tier)
 
 # ═══════════════════════════════════════════════════════
 # SECURITY MIDDLEWARE (Rate Limiting)
 # ═══════════════════════════════════════════════════════
 
-# Simple in-memory rate limiter
-RATE_LIMIT_DURATION = 60  # seconds
-RATE_LIMIT_REQUESTS = 100 # requests per minute per IP
+# GCRA limiter - constant memory per client, shared across workers when REDIS_URL is set
+RATE_LIMITING_AVAILABLE = False
+try:
+    from rate_limiter import RateLimiter, retry_after_header
+    rate_limiter = RateLimiter()
+    RATE_LIMITING_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Rate limiter not available: {e}")
 
-user_requests = collections.defaultdict(list)
+def request_session_id(request: Request) -> Optional[str]:
+    return request.headers.get("x-session-id") or request.query_params.get("session_id")
+
+def cached_request_tier(request: Request) -> tuple:
+    """
+    (tier, client key, session id still to resolve) without any I/O.
+    Only sessions already cached as premium get their own bucket; unknown ones are
+    charged to the IP bucket until a request that got through has resolved them.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    session_id = request_session_id(request)
+    if session_id:
+        cached = cached_premium(session_id)
+        if cached is None:
+            return "free", client_ip, session_id
+        if cached:
+            return "premium", session_id, None
+    return "free", client_ip, None
+
+async def get_request_tier(request: Request) -> tuple:
+    """(tier, client key), resolving the session against the DB - only for admitted requests"""
+    tier, client, unresolved = cached_request_tier(request)
+    if unresolved and await asyncio.to_thread(is_user_premium, unresolved):
+        return "premium", unresolved
+    return tier, client
 
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
     # Only limit API endpoints, skip static docs/health
-    if not request.url.path.startswith("/api/v1/"):
+    if not RATE_LIMITING_AVAILABLE or not request.url.path.startswith("/api/v1/"):
         return await call_next(request)
         
-    client_ip = request.client.host
-    now = time.time()
-    
-    # Filter out old requests
-    user_requests[client_ip] = [req_time for req_time in user_requests[client_ip] 
-                                if req_time > now - RATE_LIMIT_DURATION]
-    
-    if len(user_requests[client_ip]) >= RATE_LIMIT_REQUESTS:
+    # The bucket is charged before any entitlement lookup, so rotating made-up
+    # session ids costs the caller its IP quota, not us a DB connection each
+    tier, client, unresolved = cached_request_tier(request)
+    result = await rate_limiter.check_async(request.url.path, client, tier)
+    if result is not None and not result["allowed"]:
         return JSONResponse(
             status_code=429,
-            content={"detail": "Too many requests. Please slow down and respect the market pulse."}
+            content={"detail": "Too many requests. Please slow down and respect the market pulse."},
+            headers={
+                "Retry-After": retry_after_header(result["retry_after"]),
+                "X-RateLimit-Limit": str(result["limit"]),
+                "X-RateLimit-Remaining": "0",
+            }
         )
     
-    user_requests[client_ip].append(now)
+    if unresolved:
+        # Admitted: warm the entitlement cache for this request's handlers and the next request
+        await asyncio.to_thread(is_user_premium, unresolved)
     response = await call_next(request)
+    if result is None:
+        return response
+    response.headers["X-RateLimit-Limit"] = str(result["limit"])
+    response.headers["X-RateLimit-Remaining"] = str(result["remaining"])
     return response
 
+# ═══════════════════════════════════════════════════════
+# COMPRESSION (gzip / brotli)
+# ═══════════════════════════════════════════════════════
+
+# Wraps the cache and rate limiter. Cached responses arrive already encoded and pass straight through.
+COMPRESSION_AVAILABLE = False
+try:
+    from compression import negotiate, is_compressible, compress
+    COMPRESSION_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Compression not available: {e}")
+
+@app.middleware("http")
+async def compression_middleware(request: Request, call_next):
+    encoding = negotiate(request.headers.get("accept-encoding")) if COMPRESSION_AVAILABLE else None
+    response = await call_next(request)
+    if encoding is None or "content-encoding" in response.headers:
+        return response
+    
+    # Streaming bodies (trade exports) have no content-length and are left alone
+    length = response.headers.get("content-length")
+    if length is None or not is_compressible(response.headers.get("content-type"), int(length)):
+        return response
+    
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    compressed = Response(content=compress(body, encoding), status_code=response.status_code)
+    compressed.raw_headers.extend(
+        (name, value) for name, value in response.raw_headers if name != b"content-length"
+    )
+    compressed.headers["Content-Encoding"] = encoding
+    compressed.headers.add_vary_header("Accept-Encoding")
+    return compressed
+
+# ═══════════════════════════════════════════════════════
+# CORS
+# ═══════════════════════════════════════════════════════
+
+# Registered last, so it is the outermost middleware: cached hits, 304s and 429s
+# all leave through it and carry the allow-origin headers
+ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
+if not ALLOWED_ORIGINS or ALLOWED_ORIGINS == [""]:
+    ALLOWED_ORIGINS = ["*"]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 # ═══════════════════════════════════════════════════════
 # AI QUOTA SYSTEM (Free=5/day, Premium=Unlimited)
 # ═══════════════════════════════════════════════════════
 
 FREE_AI_DAILY_LIMIT = 5  # Free users get 5 AI requests per day
 
-# In-memory quota storage (use Redis in production)
-# Key: f"ai_quota:{session_id}:{date}" -> count
-ai_quota_storage: Dict[str, int] = {}
-
-def get_today_key() -> str:
-    """Get today's date string for quota key"""
-    return datetime.now().strftime("%Y-%m-%d")
+# Persistent ledger - Redis when REDIS_URL is set, else the ai_quota_usage table
+QUOTA_LEDGER_AVAILABLE = False
+try:
+    from quota_ledger import QuotaLedger
+    QUOTA_LEDGER_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Quota ledger not available: {e}")
 
 def check_ai_quota(session_id: str) -> dict:
     """
@@ -281,11 +392,12 @@ def check_ai_quota(session_id: str) -> dict:
     if is_premium:
         return {"allowed": True, "remaining": -1, "limit": -1, "is_premium": True}
     
-    # 2. Check quota for free users
-    today = get_today_key()
-    quota_key = f"ai_quota:{session_id}:{today}"
-    
-    current_usage = ai_quota_storage.get(quota_key, 0)
+    # 2. Check quota for free users. Without a ledger nothing can be counted, so (like
+    # increment_ai_quota) free requests are refused rather than left unmetered
+    if QUOTA_LEDGER_AVAILABLE:
+        current_usage = quota_ledger.usage(session_id, FREE_AI_DAILY_LIMIT)
+    else:
+        current_usage = FREE_AI_DAILY_LIMIT
     remaining = FREE_AI_DAILY_LIMIT - current_usage
     
     return {
@@ -296,18 +408,18 @@ def check_ai_quota(session_id: str) -> dict:
         "used": current_usage
     }
 
-def increment_ai_quota(session_id: str) -> None:
-    """Increment AI usage for a session"""
-    today = get_today_key()
-    quota_key = f"ai_quota:{session_id}:{today}"
-    ai_quota_storage[quota_key] = ai_quota_storage.get(quota_key, 0) + 1
-    
-    # Clean old keys (simple cleanup - remove yesterday's entries)
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    keys_to_remove = [k for k in ai_quota_storage.keys() if yesterday in k or 
-                      (k.split(":")[-1] < yesterday and "ai_quota" in k)]
-    for k in keys_to_remove:
-        ai_quota_storage.pop(k, None)
+def increment_ai_quota(session_id: str) -> bool:
+    """
+    Use one AI request from today's quota.
+    Check and increment are a single atomic step, so concurrent requests on
+    different workers can't exceed the limit. Returns False when exhausted.
+    """
+    if is_user_premium(session_id):
+        return True
+    if not QUOTA_LEDGER_AVAILABLE:
+        return False
+    allowed, _ = quota_ledger.consume(session_id, FREE_AI_DAILY_LIMIT)
+    return allowed
 
 @app.get("/api/v1/ai/quota/{session_id}")
 def get_ai_quota(session_id: str):
@@ -337,14 +449,13 @@ class Article(BaseModel):
     why_it_matters: Optional[str]
     fetched_at: str
 
-def fetch_live_crypto_prices():
+def fetch_live_crypto_prices(priority: Priority = Priority.CHART):
     """Fetch live crypto prices from CoinGecko"""
     try:
         ids = ",".join(COINGECKO_MAP.values())
         url = f"https://api.coingecko.com/api/v3/simple/price?ids={ids}&vs_currencies=usd&include_24hr_change=true"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        data = upstream.fetch("coingecko", url, priority, ttl=30)
+        if data:
             prices = {}
             for symbol, cg_id in COINGECKO_MAP.items():
                 if cg_id in data:
@@ -357,13 +468,12 @@ def fetch_live_crypto_prices():
         pass
     return {}
 
-def fetch_live_stock_price(symbol: str):
+def fetch_live_stock_price(symbol: str, priority: Priority = Priority.CHART, deadline: Optional[float] = None):
     """Fetch live stock price from Alpha Vantage"""
     try:
         url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={ALPHA_VANTAGE_KEY}"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        data = upstream.fetch("alphavantage", url, priority, ttl=60, deadline=deadline)
+        if data:
             quote = data.get("Global Quote", {})
             if quote:
                 price = float(quote.get("05. price", 0))
@@ -373,13 +483,12 @@ def fetch_live_stock_price(symbol: str):
         pass
     return None
 
-def fetch_live_forex_price(from_c: str, to_c: str = "USD"):
+def fetch_live_forex_price(from_c: str, to_c: str = "USD", priority: Priority = Priority.CHART, deadline: Optional[float] = None):
     """Fetch live forex price from Alpha Vantage"""
     try:
         url = f"https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency={from_c}&to_currency={to_c}&apikey={ALPHA_VANTAGE_KEY}"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        data = upstream.fetch("alphavantage", url, priority, ttl=300, deadline=deadline)
+        if data:
             rate_data = data.get("Realtime Currency Exchange Rate", {})
             if rate_data:
                 price = float(rate_data.get("5. Exchange Rate", 0))
@@ -387,15 +496,15 @@ def fetch_live_forex_price(from_c: str, to_c: str = "USD"):
     except: pass
     return None
 
-def fetch_live_commodity_price(symbol: str):
+def fetch_live_commodity_price(symbol: str, priority: Priority = Priority.CHART, deadline: Optional[float] = None):
     """Fetch live commodity price from Alpha Vantage snippets"""
     # AV has specific functions for BRENT, WTI, GOLD, etc.
     try:
         fn = "WTI" if symbol == "OIL" else symbol
         url = f"https://www.alphavantage.co/query?function={fn}&interval=daily&apikey={ALPHA_VANTAGE_KEY}"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        # Daily series - an hour of caching loses nothing
+        data = upstream.fetch("alphavantage", url, priority, ttl=3600, deadline=deadline)
+        if data:
             # Commodities return a "data" list
             if "data" in data and len(data["data"]) > 0:
                 price = float(data["data"][0].get("value", 0))
@@ -413,10 +522,45 @@ def get_trading_db():
         pass
     return None
 
+if QUOTA_LEDGER_AVAILABLE:
+    quota_ledger = QuotaLedger(get_trading_db)
+
+# Premium entitlement cache: session_id -> (is_premium, valid_until epoch seconds), LRU order
+PREMIUM_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+PREMIUM_CACHE_TTL = 300      # premium answers, further capped by premium_expires_at
+FREE_CACHE_TTL = 30          # short, so upgrades handled by another worker show up quickly
+PREMIUM_CACHE_MAX = 10000
+PREMIUM_CACHE_LOCK = threading.Lock()  # threadpool handlers and the event loop share the cache
+
+def invalidate_premium(session_id: Optional[str] = None, match: Optional[str] = None):
+    """Drop cached entitlements: one session, every session containing `match`, or everything"""
+    with PREMIUM_CACHE_LOCK:
+        if session_id:
+            PREMIUM_CACHE.pop(session_id, None)
+        elif match:
+            for sid in [sid for sid in PREMIUM_CACHE if match in sid]:
+                del PREMIUM_CACHE[sid]
+        else:
+            PREMIUM_CACHE.clear()
+
+def cached_premium(session_id: str) -> Optional[bool]:
+    """Cached entitlement, or None when unknown / expired (never touches the DB)"""
+    with PREMIUM_CACHE_LOCK:
+        cached = PREMIUM_CACHE.get(session_id)
+        if cached is None or time.time() >= cached[1]:
+            return None
+        PREMIUM_CACHE.move_to_end(session_id)
+        return cached[0]
+
 def is_user_premium(session_id: str) -> bool:
-    """Verify premium status against Database"""
+    """Verify premium status against Database (cached per session)"""
     if not session_id or session_id == "demo-user":
         return False
+    
+    now = time.time()
+    cached = cached_premium(session_id)
+    if cached is not None:
+        return cached
         
     conn = get_trading_db()
     if not conn:
@@ -428,18 +572,24 @@ def is_user_premium(session_id: str) -> bool:
         cur.execute("SELECT is_premium, premium_expires_at FROM trading_users WHERE session_id = %s", (session_id,))
         row = cur.fetchone()
         
-        if row:
-            is_premium = row.get('is_premium', False)
+        premium = False
+        valid_until = now + FREE_CACHE_TTL
+        if row and row.get('is_premium', False):
             expires_at = row.get('premium_expires_at')
-            
-            if is_premium:
-                if expires_at and expires_at < datetime.now():
-                    # Autorevoke expired directly in DB
-                    cur.execute("UPDATE trading_users SET is_premium = FALSE WHERE session_id = %s", (session_id,))
-                    conn.commit()
-                    return False
-                return True
-        return False
+            # Expired rows are revoked by the /api/cron/premium-expiry batch job, not here
+            if not expires_at or expires_at >= datetime.now():
+                premium = True
+                valid_until = now + PREMIUM_CACHE_TTL
+                if expires_at:
+                    valid_until = min(valid_until, now + (expires_at - datetime.now()).total_seconds())
+        
+        with PREMIUM_CACHE_LOCK:
+            PREMIUM_CACHE[session_id] = (premium, valid_until)
+            PREMIUM_CACHE.move_to_end(session_id)
+            # Evict least recently used - active premium sessions stay cached
+            while len(PREMIUM_CACHE) > PREMIUM_CACHE_MAX:
+                PREMIUM_CACHE.popitem(last=False)
+        return premium
     except Exception as e:
         print(f"Premium check error: {e}")
         return False
@@ -453,83 +603,12 @@ class HealthResponse(BaseModel):
     timestamp: str
     services: list
 
-# ═══════════════════════════════════════════════════════
-# HELPER FUNCTIONS (Zenith Scoring)
-# ═══════════════════════════════════════════════════════
-
-def calculate_zenith_score(pair: dict) -> float:
-    """Zenith Score for Crypto"""
-    try:
-        price_change = pair.get('priceChange', {})
-        h1 = float(price_change.get('h1', 0))
-        h6 = float(price_change.get('h6', 0))
-        h24 = float(price_change.get('h24', 0))
-        
-        momentum_score = 0
-        if h1 > 0: momentum_score += 10
-        if h1 > 5: momentum_score += 10
-        if h6 > 0: momentum_score += 15
-        if h6 > 10: momentum_score += 15
-        if h24 > 0: momentum_score += 20
-        if h24 > 15: momentum_score += 30
-        momentum_score = min(momentum_score, 100)
-        
-        liquidity = float(pair.get('liquidity', {}).get('usd', 0))
-        volume = float(pair.get('volume', {}).get('h24', 0))
-        
-        vol_score = 0
-        if liquidity > 0:
-            vol_ratio = volume / liquidity
-            if vol_ratio > 0.1: vol_score += 20
-            if vol_ratio > 0.5: vol_score += 30
-            if vol_ratio > 1.0: vol_score += 50
-        
-        if liquidity > 50000: vol_score += 20
-        if volume > 100000: vol_score += 30
-        vol_score = min(vol_score, 100)
-        
-        social_score = 50 
-
-        final_score = (0.5 * momentum_score) + (0.3 * vol_score) + (0.2 * social_score)
-        return round(min(final_score, 100), 2)
-    except Exception:
-        return 0.0
-
-def calculate_stock_score(stock: dict) -> float:
-    """Zenith Score for Stocks"""
-    try:
-        price = stock.get('price', 0)
-        change = stock.get('changesPercentage', 0)
-        volume = stock.get('volume', 0)
-        avg_volume = stock.get('avgVolume', 1)
-        
-        trend_score = 50 
-        if change > 0: trend_score += 10
-        if change > 2: trend_score += 20
-        if change > 5: trend_score += 20
-        if change < 0: trend_score -= 10
-        if change < -2: trend_score -= 20
-        trend_score = max(0, min(100, trend_score))
-
-        vol_score = 50
-        if volume > avg_volume: vol_score += 20
-        if volume > avg_volume * 1.5: vol_score += 30
-        vol_score = min(100, vol_score)
-
-        stability_score = 80 
-
-        final_score = (0.5 * trend_score) + (0.3 * vol_score) + (0.2 * stability_score)
-        return round(final_score, 0)
-    except Exception:
-        return 50.0
-
 # ═══════════════════════════════════════════════════════
 # CACHE
 # ═══════════════════════════════════════════════════════
 
-CACHE_DATA = None
-CACHE_TIMESTAMP = 0
-CACHE_DURATION = 300  # 5 minutes
+# Scored DEX tokens, refreshed in the background (see dexscreener_feed.py)
+token_feed = TokenFeed(score_pairs)
 
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_KEY") or "27PTDI7FTSYLQI4F"
 
@@ -563,7 +642,7 @@ def update_zenith_scores():
     """
     try:
         # Fetch live prices
-        live_crypto = fetch_live_crypto_prices()
+        live_crypto = fetch_live_crypto_prices(Priority.BACKGROUND)
         
         scored_assets = []
         for asset in DEFAULT_ASSETS:
@@ -616,14 +695,57 @@ def update_zenith_scores():
         return {"status": "error", "message": str(e)}
 
 
+@app.get("/api/cron/tokens")
+def refresh_token_feed():
+    """
+    CRON JOB: Refreshes the DexScreener token index.
+    Long-running servers refresh on their own; this keeps serverless instances warm.
+    """
+    try:
+        count = token_feed.refresh()
+        return {"status": "success", "tokens": count}
+    except Exception as e:
+        print(f"❌ Token feed CRON Failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.get("/api/cron/premium-expiry")
+def revoke_expired_premium():
+    """
+    CRON JOB: Revokes premium for every subscription past premium_expires_at in one statement.
+    Triggered hourly by Vercel Cron. is_user_premium already treats expired rows as free.
+    """
+    conn = get_trading_db()
+    if not conn:
+        return {"status": "error", "message": "Database unavailable"}
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE trading_users
+            SET is_premium = FALSE
+            WHERE is_premium = TRUE AND premium_expires_at < NOW()
+            RETURNING session_id
+        """)
+        revoked = [row['session_id'] for row in cur.fetchall()]
+        conn.commit()
+        for session_id in revoked:
+            invalidate_premium(session_id)
+        print(f"⏰ CRON: Revoked premium for {len(revoked)} expired subscriptions")
+        return {"status": "success", "revoked": len(revoked)}
+    except Exception as e:
+        print(f"❌ Premium expiry CRON Failed: {e}")
+        return {"status": "error", "message": str(e)}
+    finally:
+        conn.close()
+
+
 @app.get("/api/v1/market/gainers-losers")
 def get_gainers_losers():
     """Get top gainers and losers from Alpha Vantage"""
     try:
         url = f"https://www.alphavantage.co/query?function=TOP_GAINERS_LOSERS&apikey={ALPHA_VANTAGE_KEY}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
+        data = upstream.fetch("alphavantage", url, Priority.LIST, ttl=300, timeout=10)
+        if data:
             return {
                 "status": "success",
                 "gainers": data.get("top_gainers", [])[:10],
@@ -659,8 +781,14 @@ async def root():
 
 @app.get("/api/v1/health")
 def health_check_v1():
-    """Alias for health check"""
-    return {"status": "healthy", "service": "Unified API"}
+    """Alias for health check (plus upstream provider circuit state)"""
+    providers = upstream.health()
+    degraded = [name for name, info in providers.items() if info["breaker"] != "closed"]
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "service": "Unified API",
+        "upstream": providers
+    }
 
 @app.get("/api/v1/debug")
 def debug_endpoint():
@@ -737,7 +865,7 @@ async def get_articles_by_category(
                     "why_it_matters": row[11],
                     "fetched_at": row[12].isoformat() if row[12] else None
                 })
-            return {"articles": articles, "count": len(articles)}
+            return FastJSONResponse({"articles": articles, "count": len(articles)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -787,7 +915,9 @@ async def get_categories():
     try:
         with NewsDB() as db:
             stats = db.get_category_stats()
-            return {"categories": [{"category": r[0], "article_count": r[1], "avg_confidence": float(r[2]), "last_fetched": r[3].isoformat() if r[3] else None} for r in stats]}
+            payload = {"categories": [{"category": r[0], "article_count": r[1], "avg_confidence": float(r[2]), "last_fetched": r[3].isoformat() if r[3] else None} for r in stats]}
+            # No connection means an empty payload - don't cache the outage
+            return FastJSONResponse(payload, headers=None if db.cur else NO_STORE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -795,7 +925,7 @@ async def get_categories():
 async def get_stats():
     try:
         with NewsDB() as db:
-            return {
+            return FastJSONResponse({
                 "total_articles": db.get_total_articles(),
                 "categories": [
                     {"name": r[0], "count": r[1], "avg_confidence": float(r[2])} 
@@ -805,7 +935,7 @@ async def get_stats():
                     {"source": r[0], "count": r[1], "avg_confidence": float(r[2])}
                     for r in db.get_source_stats()[:10]
                 ]
-            }
+            }, headers=None if db.cur else NO_STORE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -816,88 +946,36 @@ def get_scored_tokens(
     limit: int = Query(default=100, le=500),
     min_liquidity: float = Query(default=10000),
     min_volume: float = Query(default=10000),
+    sort_by: str = Query(default="score"),
     session_id: Optional[str] = Query(None)
 ):
-    global CACHE_DATA, CACHE_TIMESTAMP
-    current_time = time.time()
-    
+    if sort_by not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(SORT_FIELDS)}")
+
     # Check premium
     premium = is_user_premium(session_id)
     effective_limit = limit
     if not premium:
         effective_limit = min(limit, 30) # Increased from 10 to 30 for better UX
     
-    if CACHE_DATA and (current_time - CACHE_TIMESTAMP < CACHE_DURATION):
-        return {
-            "status": "success", 
-            "count": len(CACHE_DATA[:effective_limit]), 
-            "data": CACHE_DATA[:effective_limit], 
-            "cached": True,
-            "premium": premium
-        }
-
     try:
-        # Fetching a broader set of pairs from multiple chains
-        queries = [
-            "uniswap eth", "pancakeswap bsc", "raydium solana",
-            "quickswap polygon", "sushiswap", "trader joe avax",
-            "jupiter solana", "orca solana", "camelot arbitrum"
-        ]
-        all_pairs = []
-        
-        for q in queries:
-            s_url = f"https://api.dexscreener.com/latest/dex/search?q={q}"
-            try:
-                r = requests.get(s_url, timeout=5)
-                if r.status_code == 200:
-                    all_pairs.extend(r.json().get('pairs', []))
-            except: continue
-
-        if not all_pairs: return {"status": "success", "count": 0, "data": []}
-        
-        tokens = []
-        seen_symbols = set()
-
-        for pair in all_pairs:
-            symbol = pair.get('baseToken', {}).get('symbol', 'UNKNOWN')
-            if symbol in seen_symbols: continue
-            if not pair.get('baseToken') or not pair.get('liquidity') or not pair.get('volume'): continue
-            
-            liquidity_usd = pair['liquidity'].get('usd', 0)
-            volume_24h = pair['volume'].get('h24', 0)
-            if liquidity_usd < min_liquidity or volume_24h < min_volume: continue
-            
-            zenith_score = calculate_zenith_score(pair)
-            tokens.append({
-                "symbol": pair['baseToken'].get('symbol', 'UNKNOWN'),
-                "name": pair['baseToken'].get('name', 'Unknown Token'),
-                "address": pair['baseToken'].get('address'),
-                "chain": pair.get('chainId', 'ethereum'),
-                "price_usd": float(pair.get('priceUsd', 0)),
-                "liquidity_usd": liquidity_usd,
-                "volume_24h": volume_24h,
-                "price_change_24h": pair.get('priceChange', {}).get('h24', 0),
-                "zenith_score": zenith_score,
-                "url": pair.get('url')
-            })
-        
-        tokens.sort(key=lambda x: x['zenith_score'], reverse=True)
-        CACHE_DATA = tokens
-        CACHE_TIMESTAMP = current_time
-        
-        return {
-            "status": "success", 
-            "count": len(tokens[:effective_limit]), 
-            "data": tokens[:effective_limit], 
-            "cached": False,
-            "premium": premium
-        }
+        # Served from the background-refreshed token index - no upstream calls on this path
+        index = token_feed.current()
+        items = index.top(effective_limit, min_liquidity, min_volume, SORT_FIELDS[sort_by])
+        return RawJSONResponse(envelope(
+            items,
+            status="success",
+            count=len(items),
+            cached=True,
+            premium=premium,
+            refreshed_at=datetime.fromtimestamp(index.refreshed_at).isoformat() if index.refreshed_at else None
+        ), headers=None if index.refreshed_at else NO_STORE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/tokens/trending")
 def get_trending_tokens(limit: int = 20):
-    return get_scored_tokens(limit=limit)
+    return get_scored_tokens(limit=limit, min_liquidity=10000, min_volume=10000, sort_by="score", session_id=None)
 
 @app.get("/api/v1/stocks/{symbol}/peers")
 def get_stock_peers(symbol: str):
@@ -945,8 +1023,8 @@ def get_trending_stocks(limit: int = 20):
     """Fetches trending stocks using Alpha Vantage TOP_GAINERS_LOSERS."""
     try:
         url = f"https://www.alphavantage.co/query?function=TOP_GAINERS_LOSERS&apikey={ALPHA_VANTAGE_KEY}"
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        # Same URL as /market/gainers-losers - one upstream call serves both
+        data = upstream.fetch("alphavantage", url, Priority.LIST, ttl=300, timeout=10) or {}
         
         market_list = []
         if "most_actively_traded" in data:
@@ -966,7 +1044,7 @@ def get_trending_stocks(limit: int = 20):
         
         # Fallback if API rate limited
         if not unique_list:
-            return {
+            return FastJSONResponse({
                 "status": "success", 
                 "data": [
                     {"symbol": "NVDA", "name": "NVIDIA", "price_usd": 140.50, "price_change_24h": 4.5, "volume_24h": 50000000, "zenith_score": 92, "type": "stock"},
@@ -975,7 +1053,7 @@ def get_trending_stocks(limit: int = 20):
                     {"symbol": "MSFT", "name": "Microsoft", "price_usd": 430.00, "price_change_24h": 0.8, "volume_24h": 25000000, "zenith_score": 75, "type": "stock"},
                     {"symbol": "GOOGL", "name": "Alphabet", "price_usd": 175.00, "price_change_24h": -0.5, "volume_24h": 20000000, "zenith_score": 70, "type": "stock"},
                 ]
-            }
+            }, headers=NO_STORE)
 
         stocks = []
         for item in unique_list[:limit]:
@@ -984,17 +1062,22 @@ def get_trending_stocks(limit: int = 20):
             change = float(change_str) if change_str else 0
             volume = float(item.get('volume', 0))
             
-            score = calculate_stock_score({'price': price, 'changesPercentage': change, 'volume': volume, 'avgVolume': volume})
-            
             stocks.append({
                 "symbol": item.get('ticker'),
                 "name": item.get('ticker'),
                 "price_usd": price,
                 "price_change_24h": change,
                 "volume_24h": volume,
-                "zenith_score": score,
                 "type": "stock"
             })
+        
+        # Whole page scored in one vectorized pass
+        scores = score_stock_rows([
+            {'price': s['price_usd'], 'changesPercentage': s['price_change_24h'], 'volume': s['volume_24h'], 'avgVolume': s['volume_24h']}
+            for s in stocks
+        ])
+        for stock, score in zip(stocks, scores):
+            stock["zenith_score"] = score
             
         stocks.sort(key=lambda x: x['zenith_score'], reverse=True)
         return {"status": "success", "count": len(stocks), "data": stocks}
@@ -1006,8 +1089,7 @@ def get_stock_quote(symbol: str):
     """Get detailed quote using Alpha Vantage GLOBAL_QUOTE."""
     try:
         url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={ALPHA_VANTAGE_KEY}"
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        data = upstream.fetch("alphavantage", url, Priority.CHART, ttl=60, timeout=10) or {}
         
         quote = data.get("Global Quote", {})
         
@@ -1070,28 +1152,22 @@ FOREX_PAIRS = [
 COMMODITY_SYMBOLS = ['WTI', 'BRENT', 'NATURAL_GAS', 'COPPER', 'ALUMINUM', 'WHEAT', 'CORN', 'COFFEE', 'COTTON', 'SUGAR']
 
 
-def calculate_forex_score(change: float) -> float:
-    """Simple Zenith Score for forex based on volatility"""
-    score = 50
-    abs_change = abs(change)
-    if abs_change > 0.5: score += 15
-    if abs_change > 1.0: score += 15
-    if abs_change > 2.0: score += 20
-    # Directional bonus
-    if change > 0: score += 5
-    return min(100, score)
-
-
 @app.get("/api/v1/forex/rates")
 def get_forex_rates(limit: int = 20):
     """Get forex exchange rates with Zenith Scores"""
     try:
         results = []
+        # One time budget for the whole page; pairs that can't get quota in time come from cache or fallback
+        partial = False  # some symbols missed the budget - serve the page, don't cache it
+        budget_end = time.monotonic() + 2.0
         for from_cur, to_cur in FOREX_PAIRS[:limit]:
             try:
                 url = f"https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency={from_cur}&to_currency={to_cur}&apikey={ALPHA_VANTAGE_KEY}"
-                response = requests.get(url, timeout=5)
-                data = response.json()
+                data = upstream.fetch("alphavantage", url, Priority.LIST, ttl=300,
+                                      deadline=max(0.0, budget_end - time.monotonic()))
+                if not data:
+                    partial = True
+                    continue
                 
                 if 'Realtime Currency Exchange Rate' in data:
                     rate_data = data['Realtime Currency Exchange Rate']
@@ -1108,10 +1184,12 @@ def get_forex_rates(limit: int = 20):
                         "zenithScore": calculate_forex_score(0.5)
                     })
             except:
+                partial = True
                 continue
                 
-        # Fallback mock if API fails
-        if not results:
+        # Fallback mock if API fails (served, never cached)
+        mocked = not results
+        if mocked:
             import random
             for from_cur, to_cur in FOREX_PAIRS[:limit]:
                 rate = 2650.45 if from_cur == 'XAU' else 31.25 if from_cur == 'XAG' else 149.85 if to_cur == 'JPY' else 1.0 + random.random() * 0.5
@@ -1125,7 +1203,8 @@ def get_forex_rates(limit: int = 20):
                     "zenithScore": calculate_forex_score(change)
                 })
         
-        return {"status": "success", "count": len(results), "data": results}
+        return FastJSONResponse({"status": "success", "count": len(results), "data": results},
+                                headers=NO_STORE if mocked or partial else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1148,11 +1227,16 @@ def get_commodity_prices(limit: int = 20):
             'SUGAR': {'name': 'Sugar', 'unit': '/lb', 'category': 'agriculture'},
         }
         
+        partial = False  # some symbols missed the budget - serve the page, don't cache it
+        budget_end = time.monotonic() + 2.0
         for symbol in COMMODITY_SYMBOLS[:limit]:
             try:
                 url = f"https://www.alphavantage.co/query?function={symbol}&interval=daily&apikey={ALPHA_VANTAGE_KEY}"
-                response = requests.get(url, timeout=5)
-                data = response.json()
+                data = upstream.fetch("alphavantage", url, Priority.LIST, ttl=3600,
+                                      deadline=max(0.0, budget_end - time.monotonic()))
+                if not data:
+                    partial = True
+                    continue
                 
                 if 'data' in data and len(data['data']) > 0:
                     latest = data['data'][0]
@@ -1170,10 +1254,12 @@ def get_commodity_prices(limit: int = 20):
                         "category": info.get('category', 'other')
                     })
             except:
+                partial = True
                 continue
         
-        # Fallback mock
-        if not results:
+        # Fallback mock (served, never cached)
+        mocked = not results
+        if mocked:
             import random
             default_prices = {'WTI': 71.25, 'BRENT': 75.80, 'NATURAL_GAS': 2.45, 'COPPER': 4.12, 'ALUMINUM': 1.15, 'WHEAT': 5.85, 'CORN': 4.25, 'COFFEE': 1.85, 'COTTON': 0.73, 'SUGAR': 0.21}
             for symbol in COMMODITY_SYMBOLS[:limit]:
@@ -1191,7 +1277,8 @@ def get_commodity_prices(limit: int = 20):
                     "category": info.get('category', 'other')
                 })
         
-        return {"status": "success", "count": len(results), "data": results}
+        return FastJSONResponse({"status": "success", "count": len(results), "data": results},
+                                headers=NO_STORE if mocked or partial else None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1203,7 +1290,14 @@ def get_commodity_prices(limit: int = 20):
 @app.get("/api/v1/trading/health")
 def trading_health():
     """Check if trading is enabled"""
-    return {"enabled": TRADING_ENABLED, "status": "healthy" if TRADING_ENABLED else "disabled"}
+    return {
+        "enabled": TRADING_ENABLED,
+        "status": "healthy" if TRADING_ENABLED else "disabled",
+        # Seen by this worker since startup (in-memory, no DB scan) - other workers not included
+        "active_users_1h": activity.active_count(3600) if TRADING_ENGINE_AVAILABLE else 0,
+        "active_users_24h": activity.active_count() if TRADING_ENGINE_AVAILABLE else 0,
+        "active_users_scope": "worker"
+    }
 
 
 
@@ -1212,8 +1306,9 @@ def get_trading_assets():
     """Get all tradeable assets with LIVE prices from CoinGecko/Alpha Vantage"""
     try:
         # Fetch live crypto prices
-        live_crypto = fetch_live_crypto_prices()
+        live_crypto = fetch_live_crypto_prices(Priority.LIST)
         
+        # Non-crypto quotes only use quota that is free right now; the rest come from cache or defaults
         assets_list = []
         for a in DEFAULT_ASSETS:
             symbol = a["symbol"]
@@ -1223,7 +1318,7 @@ def get_trading_assets():
                 price = live_crypto[symbol]["price"]
                 change = live_crypto[symbol]["change_24h"]
             elif asset_type == "stock":
-                stock_data = fetch_live_stock_price(symbol)
+                stock_data = fetch_live_stock_price(symbol, Priority.LIST, deadline=0)
                 if stock_data:
                     price = stock_data["price"]
                     change = stock_data["change_24h"]
@@ -1234,7 +1329,7 @@ def get_trading_assets():
                 # Assume symbols like EURUSD
                 from_c = symbol[:3]
                 to_c = symbol[3:] if len(symbol) > 3 else "USD"
-                fx_data = fetch_live_forex_price(from_c, to_c)
+                fx_data = fetch_live_forex_price(from_c, to_c, Priority.LIST, deadline=0)
                 if fx_data:
                     price = fx_data["price"]
                     change = fx_data["change_24h"]
@@ -1242,7 +1337,7 @@ def get_trading_assets():
                     price = a["price"]
                     change = 0.0
             elif asset_type == "commodity":
-                comm_data = fetch_live_commodity_price(symbol)
+                comm_data = fetch_live_commodity_price(symbol, Priority.LIST, deadline=0)
                 if comm_data:
                     price = comm_data["price"]
                     change = comm_data["change_24h"]
@@ -1303,7 +1398,6 @@ def register_trading_session(session_id: str = Query(None)):
         if TRADING_ENGINE_AVAILABLE:
             try:
                 with TradingEngine() as engine:
-                    user = engine.get_or_create_user(session_id)
                     portfolio = engine.get_portfolio(session_id)
                     return {
                         "status": "success",
@@ -1342,7 +1436,7 @@ def get_portfolio(session_id: str):
         if TRADING_ENGINE_AVAILABLE:
             with TradingEngine() as engine:
                 portfolio = engine.get_portfolio(session_id)
-                return {"status": "success", "data": portfolio}
+                return FastJSONResponse({"status": "success", "data": portfolio})
         
         # Fallback Mock
         return {"status": "success", "data": {
@@ -1452,31 +1546,94 @@ def execute_trade(payload: TradePayload):
 
 
 @app.get("/api/v1/trading/history/{session_id}")
-def get_trade_history(session_id: str, limit: int = Query(default=50, le=100)):
-    """Get trade history for a session"""
+def get_trade_history(session_id: str, limit: int = Query(default=50, le=100), cursor: Optional[str] = Query(None)):
+    """Get trade history for a session (pass next_cursor back to get the next page)"""
     try:
         if TRADING_ENGINE_AVAILABLE:
             with TradingEngine() as engine:
-                history = engine.get_trade_history(session_id, limit)
-                return {"status": "success", "count": len(history), "data": history}
-        return {"status": "success", "count": 0, "data": []}
+                history = engine.get_trade_history(session_id, limit, cursor)
+                next_cursor = history[-1]['cursor'] if len(history) == limit else None
+                return FastJSONResponse({"status": "success", "count": len(history), "data": history, "next_cursor": next_cursor})
+        return {"status": "success", "count": 0, "data": [], "next_cursor": None}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        return {"status": "success", "count": 0, "data": []}
+        return {"status": "success", "count": 0, "data": [], "next_cursor": None}
+
+
+TRADE_EXPORT_COLUMNS = [
+    "id", "executed_at", "symbol", "asset_name", "trade_type", "order_type",
+    "quantity", "leverage", "price_at_execution", "total_value", "margin_cost",
+    "realized_pnl", "stop_loss_price", "take_profit_price", "status", "trigger_type"
+]
+
+
+def _export_value(value):
+    """Make DB values JSON/CSV friendly"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+@app.get("/api/v1/trading/history/{session_id}/export")
+def export_trade_history(session_id: str, format: str = Query(default="ndjson", pattern="^(ndjson|csv)$")):
+    """Stream a session's full trade history as NDJSON or CSV with bounded memory"""
+    if not TRADING_ENGINE_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Trading engine unavailable")
+
+    def generate():
+        with TradingEngine() as engine:
+            user_id = engine.get_user_id(session_id)
+            if user_id is None:
+                return
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if format == "csv":
+                writer.writerow(TRADE_EXPORT_COLUMNS)
+
+            for i, trade in enumerate(engine.iter_trade_history(user_id), 1):
+                values = [_export_value(trade.get(col)) for col in TRADE_EXPORT_COLUMNS]
+                if format == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(dumps_str(dict(zip(TRADE_EXPORT_COLUMNS, values))) + "\n")
+
+                # Flush in chunks rather than per row
+                if i % 200 == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            yield buffer.getvalue()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"trades_{session_id}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @app.get("/api/v1/trading/leaderboard")
-def get_leaderboard(limit: int = Query(default=10, le=50)):
-    """Get top traders leaderboard"""
+def get_leaderboard(limit: int = Query(default=10, le=50), include_metrics: bool = Query(default=False)):
+    """Get top traders leaderboard (optionally with Sharpe/Sortino/beta per trader)"""
     try:
         if TRADING_ENGINE_AVAILABLE:
             with TradingEngine() as engine:
-                leaderboard = engine.get_leaderboard(limit)
-                return {"status": "success", "count": len(leaderboard), "data": leaderboard}
+                if include_metrics:
+                    leaderboard = engine.get_leaderboard_performance(limit)
+                else:
+                    leaderboard = engine.get_leaderboard(limit)
+                return FastJSONResponse({"status": "success", "count": len(leaderboard), "data": leaderboard})
         
         # Mock Leaderboard
-        return {"status": "success", "count": 1, "data": [{"rank": 1, "session_id": "demo", "pnl": 500.0, "win_rate": 80.0}]}
+        return FastJSONResponse({"status": "success", "count": 1, "data": [{"rank": 1, "session_id": "demo", "pnl": 500.0, "win_rate": 80.0}]}, headers=NO_STORE)
     except Exception as e:
-        return {"status": "success", "count": 0, "data": []}
+        return FastJSONResponse({"status": "success", "count": 0, "data": []}, headers=NO_STORE)
 
 
 @app.get("/api/v1/trading/price/{symbol}")
@@ -1549,13 +1706,26 @@ def get_portfolio_history(session_id: str, hours: int = Query(default=24, le=168
 
 
 
+@app.get("/api/v1/trading/performance/{session_id}")
+def get_performance(session_id: str):
+    """Get risk/return metrics (Sharpe, Sortino, volatility, beta, rolling returns)"""
+    try:
+        if TRADING_ENGINE_AVAILABLE:
+            with TradingEngine() as engine:
+                return FastJSONResponse({"status": "success", "data": engine.get_performance(session_id)})
+        return {"status": "success", "data": {"session_id": session_id, "performance": None}}
+    except Exception as e:
+        print(f"Performance Error: {e}")
+        return {"status": "error", "message": str(e)}
+
+
 @app.get("/api/v1/trading/analytics/{session_id}")
 def get_analytics(session_id: str):
     """Get advanced analytics for the dashboard"""
     try:
         if TRADING_ENGINE_AVAILABLE:
             with TradingEngine() as engine:
-                return {"status": "success", "data": engine.get_analytics(session_id)}
+                return FastJSONResponse({"status": "success", "data": engine.get_analytics(session_id)})
         else:
             # Mock data
             return {
@@ -1853,6 +2023,10 @@ async def paypal_webhook(request: Request):
                         """, (expiry, custom_id))
                     
                     conn.commit()
+                    if "@" in custom_id:
+                        invalidate_premium(match=custom_id)
+                    else:
+                        invalidate_premium(custom_id)
                     print(f"🚀 Premium Activated for {custom_id} until {expiry}")
                     return {"status": "success", "message": "Premium activated"}
                 except Exception as e:
@@ -2113,22 +2287,22 @@ async def websocket_prices(websocket: WebSocket):
             try:
                 with TradingEngine() as engine:
                     assets = engine.get_all_assets()
-                    await websocket.send_json({
+                    await websocket.send_text(dumps_str({
                         "type": "initial_prices",
                         "data": {a['symbol']: float(a['current_price']) for a in assets},
                         "timestamp": datetime.now().isoformat()
-                    })
+                    }))
             except Exception as e:
                 print(f"WS Initial Prices Error: {e}")
         else:
              # Fallback: Fetch Live Prices directly
              try:
                  live = fetch_live_crypto_prices()
-                 await websocket.send_json({
+                 await websocket.send_text(dumps_str({
                         "type": "initial_prices",
                         "data": {k: v['price'] for k, v in live.items()},
                         "timestamp": datetime.now().isoformat()
-                    })
+                    }))
              except:
                  pass
         
@@ -2174,16 +2348,16 @@ async def websocket_trading(websocket: WebSocket, session_id: str):
             try:
                 with TradingEngine() as engine:
                     portfolio = engine.get_portfolio(session_id)
-                    await websocket.send_json({
+                    await websocket.send_text(dumps_str({
                         "type": "portfolio_update",
                         "data": portfolio,
                         "timestamp": datetime.now().isoformat()
-                    })
+                    }))
             except Exception as e:
                 print(f"WS Portfolio Init Error: {e}")
         else:
             # Fallback Mock Portfolio
-            await websocket.send_json({
+            await websocket.send_text(dumps_str({
                 "type": "portfolio_update",
                 "data": {
                     "session_id": session_id,
@@ -2199,7 +2373,7 @@ async def websocket_trading(websocket: WebSocket, session_id: str):
                     "holdings": []
                 },
                 "timestamp": datetime.now().isoformat()
-            })
+            }))
         
         # Listen for messages
         while True:
@@ -2213,14 +2387,14 @@ async def websocket_trading(websocket: WebSocket, session_id: str):
                     if TRADING_ENGINE_AVAILABLE:
                         with TradingEngine() as engine:
                             portfolio = engine.get_portfolio(session_id)
-                            await websocket.send_json({
+                            await websocket.send_text(dumps_str({
                                 "type": "portfolio_update",
                                 "data": portfolio,
                                 "timestamp": datetime.now().isoformat()
-                            })
+                            }))
                     else:
                          # Fallback Refresh
-                         await websocket.send_json({
+                         await websocket.send_text(dumps_str({
                             "type": "portfolio_update",
                             "data": {
                                 "session_id": session_id,
@@ -2236,7 +2410,7 @@ async def websocket_trading(websocket: WebSocket, session_id: str):
                                 "holdings": []
                             },
                             "timestamp": datetime.now().isoformat()
-                        })
+                        }))
                             
             except asyncio.TimeoutError:
                 await websocket.send_text("ping")
@@ -2256,7 +2430,7 @@ async def broadcast_price_update(prices: Dict):
     if not price_subscribers:
         return
     
-    message = json.dumps({
+    message = dumps_str({
         "type": "price_update",
         "data": prices,
         "timestamp": datetime.now().isoformat()
@@ -2278,7 +2452,7 @@ async def broadcast_to_session(session_id: str, data: Dict):
     if session_id not in active_connections:
         return
     
-    message = json.dumps(data)
+    message = dumps_str(data)
     dead = set()
     
     for ws in active_connections[session_id]:
@@ -2685,4 +2859,4 @@ def add_community_comment(post_id: int, comment: CommunityCommentRequest):
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(app, host="0.0.0.0", port=port, ws_per_message_deflate=True)
@@ -0,0 +1,204 @@
+"""
+🪞 NEAR-DUPLICATE DETECTION
+Catches syndicated copies the exact article hash misses (different byline, trailing paragraph...)
+- 64-bit SimHash over overlapping word shingles of the extracted text: similar texts get
+  fingerprints a few bits apart
+- In-memory index of recent fingerprints split into BANDS bands: two fingerprints within
+  MAX_DISTANCE bits agree exactly on at least one band (pigeonhole), so a lookup is BANDS
+  dict hits plus a popcount per candidate - not a scan of the corpus
+- Fingerprints are persisted in articles.simhash; the index is warmed from the last
+  RECENT_DAYS of articles on the first store of the process
+"""
+
+import hashlib
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+SHINGLE_WORDS = 4        # words per shingle
+MIN_WORDS = 40           # shorter texts are left to the exact hash (SimHash is noisy on them)
+MAX_DISTANCE = 3         # differing bits that still count as the same story
+BANDS = MAX_DISTANCE + 1
+RECENT_DAYS = 14         # syndication happens within days; older stories are not indexed
+RECENT_LIMIT = 100_000   # fingerprints kept in memory (oldest evicted first)
+
+WORD = re.compile(r"\w+")
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+class Screened(NamedTuple):
+    fingerprint: Optional[int]   # None when the text is too short to fingerprint
+    duplicate_of: Optional[int]  # article id of the stored near-duplicate (None: earlier in the batch)
+    is_duplicate: bool
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of the text's word shingles, or None below MIN_WORDS words"""
+    words = WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    digests = b"".join(
+        hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"), digest_size=8).digest()
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    )
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(-1, 64)
+    # Each bit is set when most shingles set it
+    majority = bits.sum(axis=0, dtype=np.int64) * 2 > bits.shape[0]
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def to_bigint(fingerprint: int) -> int:
+    """Unsigned 64-bit -> Postgres BIGINT (signed)"""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def from_bigint(value: int) -> int:
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+class SimHashIndex:
+    """Banded fingerprint index with FIFO eviction; not thread-safe on its own"""
+
+    def __init__(self, capacity: int = RECENT_LIMIT, max_distance: int = MAX_DISTANCE):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(BANDS)]
+        self.refs: Dict[int, Optional[int]] = {}   # fingerprint -> article id
+        self.order = deque()                       # fingerprints, oldest first
+
+    @staticmethod
+    def _band_keys(fingerprint: int):
+        return ((fingerprint >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS))
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """A stored fingerprint within max_distance bits (closest first), or None"""
+        best, best_distance = None, self.max_distance + 1
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, ()):
+                distance = hamming(candidate, fingerprint)
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        return best
+
+    def add(self, fingerprint: int, ref: Optional[int] = None):
+        if fingerprint in self.refs:
+            self.refs[fingerprint] = ref if ref is not None else self.refs[fingerprint]
+            return
+        self.refs[fingerprint] = ref
+        self.order.append(fingerprint)
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append(fingerprint)
+        while len(self.order) > self.capacity:
+            self._remove(self.order.popleft())
+
+    def _remove(self, fingerprint: int):
+        del self.refs[fingerprint]
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            bucket = band[key]
+            bucket.remove(fingerprint)
+            if not bucket:
+                del band[key]
+
+    def __len__(self):
+        return len(self.refs)
+
+
+class NearDuplicateFilter:
+    """Process-wide screen applied by NewsDatabase before every INSERT"""
+
+    def __init__(self, capacity: int = RECENT_LIMIT):
+        self.index = SimHashIndex(capacity)
+        self.lock = threading.Lock()
+        self.warmed = False
+        self.has_column = False   # articles.simhash exists, fingerprints are persisted
+        self.skipped = 0
+
+    # ─────────────────────────────────────────────────────
+    # STARTUP
+    # ─────────────────────────────────────────────────────
+
+    def warm(self, conn) -> int:
+        """Add articles.simhash if needed, fingerprint recent rows missing one, load the index"""
+        with self.lock:
+            if self.warmed or conn is None:
+                return len(self.index)
+            self.warmed = True
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS simhash BIGINT")
+                    cur.execute("""
+                        SELECT id, article FROM articles
+                        WHERE simhash IS NULL AND fetched_at > NOW() - %s * INTERVAL '1 day'
+                    """, (RECENT_DAYS,))
+                    fingerprints = [(article_id, simhash(text or "")) for article_id, text in cur.fetchall()]
+                    backfill = [(article_id, to_bigint(fp)) for article_id, fp in fingerprints if fp is not None]
+                    if backfill:
+                        execute_values(cur, """
+                            UPDATE articles SET simhash = v.simhash
+                            FROM (VALUES %s) AS v(id, simhash) WHERE articles.id = v.id
+                        """, backfill)
+                    cur.execute("""
+                        SELECT id, simhash FROM articles
+                        WHERE simhash IS NOT NULL AND fetched_at > NOW() - %s * INTERVAL '1 day'
+                        ORDER BY fetched_at DESC LIMIT %s
+                    """, (RECENT_DAYS, self.index.capacity))
+                    rows = cur.fetchall()
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"⚠️ Near-duplicate index not warmed (in-memory only): {e}")
+                return 0
+            self.has_column = True
+            for article_id, value in reversed(rows):  # oldest first, so eviction order holds
+                self.index.add(from_bigint(value), article_id)
+            print(f"🪞 Near-duplicate index warmed: {len(self.index)} articles ({len(backfill)} fingerprinted)")
+            return len(self.index)
+
+    # ─────────────────────────────────────────────────────
+    # SCREEN / RECORD
+    # ─────────────────────────────────────────────────────
+
+    def screen(self, texts: Iterable[str]) -> List[Screened]:
+        """Fingerprint each text and flag near-duplicates of indexed articles or of earlier texts"""
+        results = []
+        batch = SimHashIndex()  # fingerprints of this batch so far
+        with self.lock:
+            for text in texts:
+                fingerprint = simhash(text)
+                if fingerprint is None:
+                    results.append(Screened(None, None, False))
+                    continue
+                match = self.index.find(fingerprint)
+                if match is not None:
+                    results.append(Screened(fingerprint, self.index.refs[match], True))
+                elif batch.find(fingerprint) is not None:
+                    results.append(Screened(fingerprint, None, True))
+                else:
+                    batch.add(fingerprint)
+                    results.append(Screened(fingerprint, None, False))
+            self.skipped += sum(1 for result in results if result.is_duplicate)
+        return results
+
+    def add(self, fingerprint: Optional[int], article_id: Optional[int]):
+        """Index a stored article"""
+        if fingerprint is None:
+            return
+        with self.lock:
+            self.index.add(fingerprint, article_id)
+
+
+# Shared by every NewsDatabase in the process
+near_duplicates = NearDuplicateFilter()
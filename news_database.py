@@ -4,15 +4,22 @@ Handles connection and operations for Neon PostgreSQL database
 """
 
 import psycopg2
-from psycopg2.extras import execute_batch, Json
+from psycopg2.extras import execute_values, Json
 from datetime import datetime
 import hashlib
 import json
 import os
 from dotenv import load_dotenv
+from near_duplicate import near_duplicates, to_bigint
 
 load_dotenv()
 
+INSERT_COLUMNS = """hash, title, article, url, source,
+    category, category_confidence, matched_keywords,
+    word_count, importance_score, sentiment_score, why_it_matters, fetched_at"""
+
+BATCH_CHUNK_SIZE = 100  # articles per INSERT statement / commit in store_articles_batch
+
 class NewsDatabase:
     def __init__(self):
         """Initialize database connection"""
@@ -69,39 +76,58 @@ class NewsDatabase:
         """Create SHA-256 hash for deduplication"""
         return hashlib.sha256(text.encode('utf-8')).hexdigest()
     
+    def _insert_columns(self):
+        # articles.simhash is added on first use (near_duplicate.py); older tables may lack it
+        return INSERT_COLUMNS + (", simhash" if near_duplicates.has_column else "")
+    
+    def _article_row(self, data, fingerprint=None):
+        """Column values for one article, in _insert_columns() order"""
+        row = (
+            self.create_hash(data['article']),
+            data['title'],
+            data['article'],
+            data['url'],
+            data['source'],
+            data.get('category', 'General'),
+            data.get('category_confidence', 0.0),
+            Json(data.get('matched_keywords', [])),
+            len(data['article'].split()),
+            data.get('importance_score'),
+            data.get('sentiment_score'),
+            data.get('why_it_matters'),
+            datetime.utcnow()
+        )
+        if near_duplicates.has_column:
+            row += (to_bigint(fingerprint) if fingerprint is not None else None,)
+        return row
+    
     def store_article(self, data):
-        """Store a single article in database"""
-        if not self.cur: return None, False
+        """
+        Store a single article in database (near-duplicates of recent articles are skipped)
+        Returns: (article_id, is_new) - is_new is False for a duplicate, None if the article could not be stored
+        """
+        if not self.cur: return None, None
 
-        # Create hash for deduplication
-        article_hash = self.create_hash(data['article'])
-        word_count = len(data['article'].split())
+        near_duplicates.warm(self.conn)
+        screened = near_duplicates.screen([data['article']])[0]
+        if screened.is_duplicate:
+            print(f"⚠️  Near-duplicate skipped: {data['title'][:50]}... (of ID {screened.duplicate_of})")
+            return None, False
         
+        article_id, is_new = self._insert_article(data, screened.fingerprint)
+        if is_new:
+            near_duplicates.add(screened.fingerprint, article_id)
+        return article_id, is_new
+    
+    def _insert_article(self, data, fingerprint=None):
         try:
-            self.cur.execute("""
-                INSERT INTO articles (
-                    hash, title, article, url, source, 
-                    category, category_confidence, matched_keywords,
-                    word_count, importance_score, sentiment_score, why_it_matters, fetched_at
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            row = self._article_row(data, fingerprint)
+            self.cur.execute(f"""
+                INSERT INTO articles ({self._insert_columns()})
+                VALUES ({", ".join(["%s"] * len(row))})
                 ON CONFLICT (hash) DO NOTHING
                 RETURNING id
-            """, (
-                article_hash,
-                data['title'],
-                data['article'],
-                data['url'],
-                data['source'],
-                data.get('category', 'General'),
-                data.get('category_confidence', 0.0),
-                Json(data.get('matched_keywords', [])),
-                word_count,
-                data.get('importance_score'),
-                data.get('sentiment_score'),
-                data.get('why_it_matters'),
-                datetime.utcnow()
-            ))
+            """, row)
             
             result = self.cur.fetchone()
             self.conn.commit()
@@ -117,24 +143,67 @@ class NewsDatabase:
         except Exception as e:
             if self.conn: self.conn.rollback()
             print(f"❌ Error storing article: {e}")
-            return None, False
+            return None, None
     
-    def store_articles_batch(self, articles):
-        """Store multiple articles in batch"""
-        if not self.cur: return 0, 0
+    def store_articles_batch(self, articles, chunk_size=BATCH_CHUNK_SIZE):
+        """
+        Store many articles: one multi-row INSERT ... RETURNING and one commit per chunk
+        Near-duplicates (of recent articles or of each other) are dropped before the INSERT
+        Returns: [(article_id, is_new)] in input order, as store_article: article_id is None
+        for duplicates (is_new False) and for articles that could not be stored (is_new None)
+        """
+        if not self.cur: return [(None, None)] * len(articles)
 
-        stored = 0
-        duplicates = 0
-        
-        for article in articles:
-            article_id, is_new = self.store_article(article)
-            if is_new:
-                stored += 1
+        near_duplicates.warm(self.conn)
+        screened = near_duplicates.screen([data['article'] for data in articles])
+        results = [(None, False)] * len(articles)
+        pending = []  # (input position, article, fingerprint)
+        for position, (data, check) in enumerate(zip(articles, screened)):
+            if check.is_duplicate:
+                of = f"ID {check.duplicate_of}" if check.duplicate_of is not None else "an earlier article in this batch"
+                print(f"⚠️  Near-duplicate skipped: {data['title'][:50]}... (of {of})")
             else:
-                duplicates += 1
+                pending.append((position, data, check.fingerprint))
+        
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            stored_chunk = self._store_chunk([(data, fingerprint) for _, data, fingerprint in chunk])
+            for (position, _, fingerprint), (article_id, is_new) in zip(chunk, stored_chunk):
+                results[position] = (article_id, is_new)
+                if is_new:
+                    near_duplicates.add(fingerprint, article_id)
+        
+        stored = sum(1 for _, is_new in results if is_new)
+        failed = sum(1 for _, is_new in results if is_new is None)
+        near = len(articles) - len(pending)
+        print(f"\n📊 Batch complete: {stored} stored, {len(results) - stored - failed} duplicates "
+              f"({near} near-duplicates), {failed} failed")
+        return results
+    
+    def _store_chunk(self, chunk):
+        """chunk: [(article, fingerprint)]"""
+        rows = [self._article_row(data, fingerprint) for data, fingerprint in chunk]
+        try:
+            inserted = execute_values(self.cur, f"""
+                INSERT INTO articles ({self._insert_columns()})
+                VALUES %s
+                ON CONFLICT (hash) DO NOTHING
+                RETURNING id, hash
+            """, rows, page_size=len(rows), fetch=True)
+            self.conn.commit()
+        except Exception as e:
+            # One bad row fails the whole statement - retry the chunk row by row to isolate it
+            if self.conn: self.conn.rollback()
+            print(f"⚠️  Bulk insert failed ({e}), storing {len(chunk)} articles one by one")
+            return [self._insert_article(data, fingerprint) for data, fingerprint in chunk]
         
-        print(f"\n📊 Batch complete: {stored} stored, {duplicates} duplicates")
-        return stored, duplicates
+        # Map RETURNING rows back to inputs; an in-batch repeat of a hash is a duplicate
+        ids = {article_hash: article_id for article_id, article_hash in inserted}
+        results = []
+        for row in rows:
+            article_id = ids.pop(row[0], None)
+            results.append((article_id, article_id is not None))
+        return results
     
     def get_recent_articles(self, category=None, limit=10):
         """Get recent articles, optionally filtered by category"""
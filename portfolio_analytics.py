@@ -0,0 +1,250 @@
+"""
+📊 PORTFOLIO PERFORMANCE ANALYTICS
+Vectorized risk/return metrics computed from trading_portfolio_history equity curves
+Sharpe, Sortino, volatility, beta vs BTC/SPX, drawdown and rolling returns in one NumPy pass
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import psycopg2.extensions
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+SNAPSHOT_INTERVAL_SECONDS = 300  # snapshot_loop cadence in trading_services.py
+PERIODS_PER_YEAR = 365 * 24 * 3600 / SNAPSHOT_INTERVAL_SECONDS  # markets we track trade 24/7
+RISK_FREE_RATE = 0.0  # annual, paper money earns nothing
+HISTORY_LOOKBACK_DAYS = 90
+
+ROLLING_WINDOWS = {
+    "24h": 24 * 3600,
+    "7d": 7 * 24 * 3600,
+    "30d": 30 * 24 * 3600,
+}
+
+# user_id -> (last snapshot timestamp, metrics), least recently requested first
+METRICS_CACHE: "OrderedDict[int, tuple]" = OrderedDict()
+METRICS_CACHE_MAX = 10000
+
+
+# ═══════════════════════════════════════════════════════
+# LOADING
+# ═══════════════════════════════════════════════════════
+
+def load_equity_curves(conn, user_ids: Iterable[int],
+                       lookback_days: int = HISTORY_LOOKBACK_DAYS) -> np.ndarray:
+    """
+    Load equity curves for many users in a single query.
+    Returns an (n, 5) float64 array: user_id, epoch seconds, portfolio value, BTC price, SPX price
+    sorted by user then time. Missing benchmark prices come back as NaN.
+    """
+    # Plain tuple cursor - RealDictCursor rows would need a per-row dict conversion
+    cur = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+    try:
+        cur.execute("""
+            SELECT user_id::float8,
+                   EXTRACT(EPOCH FROM recorded_at)::float8,
+                   portfolio_value::float8,
+                   COALESCE(btc_price::float8, 'NaN'),
+                   COALESCE(spx_price::float8, 'NaN')
+            FROM trading_portfolio_history
+            WHERE user_id = ANY(%s)
+            AND recorded_at > NOW() - make_interval(days => %s)
+            ORDER BY user_id, recorded_at
+        """, (list(user_ids), lookback_days))
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    if not rows:
+        return np.empty((0, 5), dtype=np.float64)
+    return np.asarray(rows, dtype=np.float64)
+
+
+# ═══════════════════════════════════════════════════════
+# VECTORIZED METRICS
+# ═══════════════════════════════════════════════════════
+
+def _segment_returns(series: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Period-over-period simple returns; the first point of every curve is NaN"""
+    prev = np.empty_like(series)
+    prev[0] = np.nan
+    prev[1:] = series[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = series / prev - 1.0
+    returns[starts] = np.nan
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def _segment_beta(returns: np.ndarray, bench: np.ndarray, seg: np.ndarray, k: int) -> np.ndarray:
+    """Per-user beta of portfolio returns against benchmark returns"""
+    paired = np.isfinite(returns) & np.isfinite(bench)
+    r = np.where(paired, returns, 0.0)
+    b = np.where(paired, bench, 0.0)
+
+    n = np.bincount(seg, weights=paired, minlength=k)
+    sum_r = np.bincount(seg, weights=r, minlength=k)
+    sum_b = np.bincount(seg, weights=b, minlength=k)
+    sum_rb = np.bincount(seg, weights=r * b, minlength=k)
+    sum_bb = np.bincount(seg, weights=b * b, minlength=k)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sum_rb / n - (sum_r / n) * (sum_b / n)
+        var_b = sum_bb / n - (sum_b / n) ** 2
+        beta = cov / var_b
+    beta[(n < 2) | ~(var_b > 0)] = np.nan
+    return beta
+
+
+def compute_metrics(curves: np.ndarray) -> Dict[int, dict]:
+    """
+    Compute performance metrics for every user in `curves` (see load_equity_curves).
+    All work is done on whole columns; the only Python loop is over users when
+    building the result dicts.
+    """
+    if len(curves) == 0:
+        return {}
+
+    user_col, ts, values, btc, spx = curves.T
+    n = len(values)
+
+    # Segment boundaries - one contiguous block of rows per user
+    starts = np.flatnonzero(np.r_[True, user_col[1:] != user_col[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    k = len(starts)
+    seg = np.repeat(np.arange(k), np.diff(np.r_[starts, n]))
+
+    # 1. Return moments
+    returns = _segment_returns(values, starts)
+    valid = np.isfinite(returns)
+    r = np.where(valid, returns, 0.0)
+
+    n_ret = np.bincount(seg, weights=valid, minlength=k)
+    sum_r = np.bincount(seg, weights=r, minlength=k)
+    sum_r2 = np.bincount(seg, weights=r * r, minlength=k)
+    downside_sq = np.bincount(seg, weights=np.minimum(r, 0.0) ** 2, minlength=k)
+
+    rf_per_period = RISK_FREE_RATE / PERIODS_PER_YEAR
+    annualizer = np.sqrt(PERIODS_PER_YEAR)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sum_r / n_ret
+        variance = (sum_r2 - n_ret * mean ** 2) / (n_ret - 1)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        downside_dev = np.sqrt(downside_sq / n_ret)
+
+        volatility = std * annualizer
+        sharpe = (mean - rf_per_period) / std * annualizer
+        sortino = (mean - rf_per_period) / downside_dev * annualizer
+
+    too_short = n_ret < 2
+    for arr in (volatility, sharpe, sortino):
+        arr[too_short | ~np.isfinite(arr)] = np.nan
+
+    # 2. Beta vs benchmarks
+    beta_btc = _segment_beta(returns, _segment_returns(btc, starts), seg, k)
+    beta_spx = _segment_beta(returns, _segment_returns(spx, starts), seg, k)
+
+    # 3. Max drawdown - shift each curve above all previous ones so a single
+    #    running maximum restarts at every user boundary
+    span = values.max() - values.min() + 1.0
+    offset = seg * span
+    peak = np.maximum.accumulate(values + offset) - offset
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, (peak - values) / peak, np.nan)
+    max_drawdown = np.fmax.reduceat(drawdown, starts)
+
+    # 4. Total and rolling returns
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = values[ends] / values[starts] - 1.0
+
+    rel_ts = ts - ts.min()
+    band = rel_ts.max() + max(ROLLING_WINDOWS.values()) + 1.0
+    keys = seg * band + rel_ts  # globally sorted: user blocks, time inside each block
+    rolling = {}
+    for label, window in ROLLING_WINDOWS.items():
+        target_ts = rel_ts[ends] - window
+        idx = np.searchsorted(keys, np.arange(k) * band + target_ts, side="left")
+        idx = np.clip(idx, starts, ends)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            window_return = values[ends] / values[idx] - 1.0
+        # Not enough history to cover the window
+        window_return[rel_ts[starts] > target_ts + SNAPSHOT_INTERVAL_SECONDS] = np.nan
+        rolling[label] = window_return
+
+    # Build result dicts (loop over users, not rows)
+    results = {}
+    for i in range(k):
+        results[int(user_col[starts[i]])] = {
+            "sharpe_ratio": _clean(sharpe[i]),
+            "sortino_ratio": _clean(sortino[i]),
+            "volatility": _clean(volatility[i]),
+            "beta_btc": _clean(beta_btc[i]),
+            "beta_spx": _clean(beta_spx[i]),
+            "max_drawdown_pct": _clean(max_drawdown[i] * 100),
+            "total_return_pct": _clean(total_return[i] * 100),
+            "rolling_returns_pct": {
+                label: _clean(series[i] * 100) for label, series in rolling.items()
+            },
+            "snapshots": int(ends[i] - starts[i] + 1),
+            "as_of": datetime.utcfromtimestamp(ts[ends[i]]).isoformat(),
+        }
+    return results
+
+
+def _clean(value) -> Optional[float]:
+    """NaN/inf -> None so the payload stays valid JSON"""
+    value = float(value)
+    return round(value, 4) if np.isfinite(value) else None
+
+
+# ═══════════════════════════════════════════════════════
+# CACHED ENTRY POINT
+# ═══════════════════════════════════════════════════════
+
+def get_performance_metrics(conn, user_ids: List[int]) -> Dict[int, dict]:
+    """
+    Get metrics for many users at once.
+    Results are cached per user and keyed by their latest snapshot timestamp, so
+    only users with new snapshots since the last call are reloaded and recomputed.
+    The cache keeps the METRICS_CACHE_MAX most recently requested users.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return {}
+
+    cur = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+    try:
+        cur.execute("""
+            SELECT user_id, MAX(recorded_at)
+            FROM trading_portfolio_history
+            WHERE user_id = ANY(%s)
+            GROUP BY user_id
+        """, (user_ids,))
+        latest = dict(cur.fetchall())
+    finally:
+        cur.close()
+
+    stale = [uid for uid, last_ts in latest.items()
+             if uid not in METRICS_CACHE or METRICS_CACHE[uid][0] != last_ts]
+
+    if stale:
+        computed = compute_metrics(load_equity_curves(conn, stale))
+        for uid in stale:
+            METRICS_CACHE[uid] = (latest[uid], computed.get(uid))
+
+    metrics = {}
+    for uid in user_ids:
+        if uid not in latest:
+            continue
+        METRICS_CACHE.move_to_end(uid)
+        if METRICS_CACHE[uid][1] is not None:
+            metrics[uid] = METRICS_CACHE[uid][1]
+    while len(METRICS_CACHE) > METRICS_CACHE_MAX:
+        METRICS_CACHE.popitem(last=False)
+    return metrics
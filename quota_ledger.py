@@ -0,0 +1,204 @@
+"""
+🎟️ AI QUOTA LEDGER
+Daily per-session usage counters with atomic check-and-increment
+Redis (INCR + TTL) when shared_state is connected, otherwise Postgres
+(ai_quota_usage, one row per session per day). Reads are served from a small
+local cache so checking a quota doesn't cost a round trip.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from shared_state import get_redis, reset_redis
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+READ_CACHE_TTL = 10          # seconds a cached count is trusted for *display*
+BUCKET_TTL = 2 * 24 * 3600   # Redis buckets delete themselves after two days
+CACHE_MAX = 50000
+
+QUOTA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_quota_usage (
+    session_id VARCHAR(255) NOT NULL,
+    day DATE NOT NULL,
+    used INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, day)
+)
+"""
+
+# Increment only while under the limit - the row lock makes this exact across workers
+CONSUME_SQL = """
+INSERT INTO ai_quota_usage (session_id, day, used)
+VALUES (%s, %s, 1)
+ON CONFLICT (session_id, day) DO UPDATE
+SET used = ai_quota_usage.used + 1
+WHERE ai_quota_usage.used < %s
+RETURNING used
+"""
+
+# Same contract as CONSUME_SQL: returns the new count, or -1 when the limit is reached
+CONSUME_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+if used >= tonumber(ARGV[1]) then
+    return -1
+end
+used = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return used
+"""
+
+
+def today_key() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+class QuotaLedger:
+    """Daily usage counters keyed by session id"""
+
+    def __init__(self, connect: Callable, redis_getter: Callable = get_redis):
+        self.connect = connect
+        self.redis_getter = redis_getter
+        self.day = today_key()
+        self.cache: Dict[str, Tuple[int, float]] = {}  # session_id -> (used, fetched_at), today only
+        self.lock = threading.Lock()
+        self._schema_ready = False
+        self._prune_pending = False
+        self._script = None
+
+    # ─────────────────────────────────────────────────────
+    # READS
+    # ─────────────────────────────────────────────────────
+
+    def usage(self, session_id: str, limit: Optional[int] = None) -> int:
+        """Today's usage. Cached briefly; sessions already at `limit` stay cached until midnight."""
+        now = time.time()
+        with self.lock:
+            self._roll_day()
+            cached = self.cache.get(session_id)
+        if cached and (now - cached[1] < READ_CACHE_TTL or (limit is not None and cached[0] >= limit)):
+            return cached[0]
+
+        used = self._load(session_id)
+        if used is None:
+            return cached[0] if cached else 0
+        self._remember(session_id, used)
+        return used
+
+    def _load(self, session_id: str) -> Optional[int]:
+        client = self.redis_getter()
+        if client is not None:
+            try:
+                value = client.get(f"ai_quota:{session_id}:{self.day}")
+                return int(value) if value else 0
+            except Exception as e:
+                print(f"⚠️ Redis quota read failed: {e}")
+                reset_redis()
+
+        conn = self.connect()
+        if not conn:
+            return None
+        try:
+            self._ensure_schema(conn)
+            cur = conn.cursor()
+            cur.execute("SELECT used FROM ai_quota_usage WHERE session_id = %s AND day = %s",
+                        (session_id, self.day))
+            row = cur.fetchone()
+            if not row:
+                return 0
+            return row["used"] if isinstance(row, dict) else row[0]
+        except Exception as e:
+            print(f"⚠️ Quota read failed: {e}")
+            return None
+        finally:
+            conn.close()
+
+    # ─────────────────────────────────────────────────────
+    # WRITES
+    # ─────────────────────────────────────────────────────
+
+    def consume(self, session_id: str, limit: int) -> Tuple[bool, int]:
+        """
+        Atomically use one unit of today's quota.
+        Returns (allowed, used). Refuses without touching the store when the
+        cache already shows the session at its limit.
+        """
+        with self.lock:
+            self._roll_day()
+            cached = self.cache.get(session_id)
+        if cached and cached[0] >= limit:
+            return False, cached[0]
+
+        used = self._consume(session_id, limit)
+        if used is None:
+            return False, cached[0] if cached else 0
+        if used < 0:
+            self._remember(session_id, limit)
+            return False, limit
+        self._remember(session_id, used)
+        return True, used
+
+    def _consume(self, session_id: str, limit: int) -> Optional[int]:
+        day = self.day
+        client = self.redis_getter()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(CONSUME_SCRIPT)
+                return int(self._script(keys=[f"ai_quota:{session_id}:{day}"], args=[limit, BUCKET_TTL]))
+            except Exception as e:
+                print(f"⚠️ Redis quota increment failed, using database: {e}")
+                self._script = None
+                reset_redis()
+
+        conn = self.connect()
+        if not conn:
+            return None
+        try:
+            self._ensure_schema(conn)
+            cur = conn.cursor()
+            cur.execute(CONSUME_SQL, (session_id, day, limit))
+            row = cur.fetchone()
+            conn.commit()
+            if not row:
+                return -1
+            return row["used"] if isinstance(row, dict) else row[0]
+        except Exception as e:
+            print(f"⚠️ Quota increment failed: {e}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    # ─────────────────────────────────────────────────────
+    # HOUSEKEEPING
+    # ─────────────────────────────────────────────────────
+
+    def _remember(self, session_id: str, used: int):
+        with self.lock:
+            if len(self.cache) >= CACHE_MAX:
+                self.cache.clear()
+            self.cache[session_id] = (used, time.time())
+
+    def _roll_day(self):
+        """Start a fresh cache at midnight (caller holds the lock)"""
+        day = today_key()
+        if day != self.day:
+            self.day = day
+            self.cache = {}
+            self._prune_pending = True
+
+    def _ensure_schema(self, conn):
+        """Create the table once per process and drop finished days after each rollover"""
+        if self._schema_ready and not self._prune_pending:
+            return
+        cur = conn.cursor()
+        cur.execute(QUOTA_SCHEMA)
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        cur.execute("DELETE FROM ai_quota_usage WHERE day < %s", (yesterday,))
+        conn.commit()
+        self._schema_ready = True
+        self._prune_pending = False
@@ -0,0 +1,144 @@
+"""
+🚦 RATE LIMITER
+GCRA (generic cell rate algorithm) limiter with per-route, per-tier limits
+Each client costs one float (its theoretical arrival time), idle clients are
+evicted LRU-first, and state moves to Redis when shared_state has a connection
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from shared_state import get_redis, reset_redis, redis_configured
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+MAX_TRACKED_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Path prefix -> tier -> (requests, period seconds). Longest matching prefix wins.
+RATE_LIMITS: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "/api/v1/": {"free": (100, 60), "premium": (600, 60)},
+    "/api/v1/trading/trade": {"free": (30, 60), "premium": (120, 60)},
+    "/api/v1/trading/roast": {"free": (5, 60), "premium": (30, 60)},
+    "/api/v1/stocks/": {"free": (30, 60), "premium": (120, 60)},
+    "/api/v1/auth/": {"free": (20, 60), "premium": (20, 60)},
+}
+
+# Atomic GCRA step on the Redis server, using the server clock so workers agree
+GCRA_SCRIPT = """
+redis.replicate_commands()
+local emission = tonumber(ARGV[1])
+local burst_span = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + emission
+local allow_at = new_tat - burst_span
+if now < allow_at then
+    return {0, tostring(allow_at - now), '0'}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0', tostring((now - allow_at) / emission)}
+"""
+
+
+class RateLimiter:
+    """Route-aware GCRA limiter; one theoretical arrival time per (route, client)"""
+
+    def __init__(self, limits: Dict[str, Dict[str, Tuple[int, int]]] = RATE_LIMITS,
+                 max_keys: int = MAX_TRACKED_KEYS, redis_getter: Callable = get_redis):
+        self.limits = limits
+        self.prefixes = sorted(limits, key=len, reverse=True)
+        self.max_keys = max_keys
+        self.redis_getter = redis_getter
+        self.tats: "OrderedDict[str, float]" = OrderedDict()
+        self.lock = threading.Lock()
+        self._script = None
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Most specific configured prefix for a path, or None if the path is unlimited"""
+        for prefix in self.prefixes:
+            if path.startswith(prefix):
+                return prefix
+        return None
+
+    def check(self, path: str, client: str, tier: str = "free") -> Optional[dict]:
+        """
+        Count one request. Returns None for unlimited paths, otherwise
+        {"allowed", "limit", "remaining", "retry_after"}.
+        """
+        prefix = self.resolve(path)
+        if prefix is None:
+            return None
+        tiers = self.limits[prefix]
+        rate, period = tiers.get(tier, tiers["free"])
+        allowed, retry_after, remaining = self.hit(f"rl:{prefix}:{tier}:{client}", rate, period)
+        return {
+            "allowed": allowed,
+            "limit": rate,
+            "remaining": remaining,
+            "retry_after": retry_after,
+        }
+
+    async def check_async(self, path: str, client: str, tier: str = "free") -> Optional[dict]:
+        """
+        check() for the event loop. With Redis configured each step is a network round trip
+        (up to the 0.5s socket timeout), so it runs on a worker thread instead of blocking the loop.
+        """
+        if self.resolve(path) is None:
+            return None
+        if not redis_configured():
+            return self.check(path, client, tier)
+        return await asyncio.to_thread(self.check, path, client, tier)
+
+    def hit(self, key: str, rate: int, period: float) -> Tuple[bool, float, int]:
+        """One GCRA step: (allowed, seconds until allowed, requests left in the burst)"""
+        emission = period / rate
+        burst_span = period  # a full `rate` requests may arrive back to back
+
+        client = self.redis_getter()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(GCRA_SCRIPT)
+                allowed, retry_after, remaining = self._script(keys=[key], args=[emission, burst_span])
+                return bool(int(allowed)), float(retry_after), int(float(remaining))
+            except Exception as e:
+                print(f"⚠️ Redis rate limit failed, using local state: {e}")
+                self._script = None
+                reset_redis()
+
+        now = time.time()
+        with self.lock:
+            tat = max(self.tats.get(key, now), now)
+            new_tat = tat + emission
+            allow_at = new_tat - burst_span
+            if now < allow_at:
+                self.tats.move_to_end(key)
+                return False, allow_at - now, 0
+            self.tats[key] = new_tat
+            self.tats.move_to_end(key)
+            self._evict(now)
+        return True, 0.0, int((now - allow_at) / emission)
+
+    def _evict(self, now: float):
+        """Drop least-recently-seen clients once over capacity (caller holds the lock)"""
+        while len(self.tats) > self.max_keys:
+            self.tats.popitem(last=False)
+        # Clients whose arrival time has passed are back to a full burst - no need to remember them
+        while self.tats:
+            key, tat = next(iter(self.tats.items()))
+            if tat > now:
+                break
+            del self.tats[key]
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
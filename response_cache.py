@@ -0,0 +1,215 @@
+"""
+🗄️ RESPONSE CACHE
+Declarative per-route caching for read endpoints
+Bounded LRU store, ETag / If-None-Match (304) handling and single-flight
+recomputation so a burst of identical misses only hits the handler once.
+Bodies are stored pre-compressed (see compression.py) so hits cost no CPU.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from compression import negotiate, precompress
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+MAX_ENTRIES = 2000
+MAX_BYTES = 64 * 1024 * 1024
+
+# Handlers send this for payloads that must not be reused (mock fallbacks, DB down, partial pages)
+NO_STORE = {"Cache-Control": "no-store"}
+
+
+class CachePolicy(NamedTuple):
+    ttl: float                       # seconds a response stays fresh
+    vary: Tuple[str, ...] = ()       # query params that change the payload (others are ignored)
+    vary_tier: bool = False          # free and premium callers get different payloads
+
+
+# Exact request path -> policy. Only GET requests answered with 200 (and no NO_STORE) are cached.
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "/api/v1/news/categories": CachePolicy(120),
+    "/api/v1/news/stats": CachePolicy(120),
+    "/api/v1/stocks/trending": CachePolicy(300, vary=("limit",)),
+    "/api/v1/forex/rates": CachePolicy(300, vary=("limit",)),
+    "/api/v1/commodities/prices": CachePolicy(900, vary=("limit",)),
+    "/api/v1/trading/leaderboard": CachePolicy(30, vary=("limit", "include_metrics")),
+    "/api/v1/tokens/scored": CachePolicy(60, vary=("limit", "min_liquidity", "min_volume", "sort_by"), vary_tier=True),
+}
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: Optional[str]
+    etag: str
+    stored_at: float
+    expires_at: float
+    variants: Dict[str, bytes] = {}  # encoding -> compressed body
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Each encoding is a different representation, so it gets its own strong ETag"""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+def is_storable(response: Response) -> bool:
+    return response.status_code == 200 and "no-store" not in response.headers.get("cache-control", "")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], entry: CachedResponse) -> bool:
+    """True if the client holds any representation of this entry"""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    return any(entry.etag_for(encoding) in candidates for encoding in (None, *entry.variants))
+
+
+class ResponseCache:
+    """LRU store of rendered response bodies, bounded by entry count and total bytes"""
+
+    def __init__(self, policies: Dict[str, CachePolicy] = CACHE_POLICIES,
+                 max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.policies = policies
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.size = 0
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.waiters: Dict[str, int] = {}  # requests holding or queued on locks[key]
+        self.hits = 0
+        self.misses = 0
+
+    def policy_for(self, request: Request) -> Optional[CachePolicy]:
+        if request.method != "GET":
+            return None
+        return self.policies.get(request.url.path)
+
+    def key_for(self, request: Request, policy: CachePolicy, tier: str = "free") -> str:
+        params = request.query_params
+        parts = [request.url.path]
+        parts.extend(f"{name}={params.get(name, '')}" for name in policy.vary)
+        if policy.vary_tier:
+            parts.append(f"tier={tier}")
+        return "|".join(parts)
+
+    # ─────────────────────────────────────────────────────
+    # STORE
+    # ─────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry.expires_at:
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        self._drop(key)
+        self.entries[key] = entry
+        self.size += entry.size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._drop(oldest)
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drop every cached variant of a path, or everything"""
+        for key in [k for k in self.entries if path is None or k.split("|", 1)[0] == path]:
+            self._drop(key)
+
+    def _drop(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    # ─────────────────────────────────────────────────────
+    # SERVING
+    # ─────────────────────────────────────────────────────
+
+    async def serve(self, request: Request, call_next, policy: CachePolicy, tier: str = "free") -> Response:
+        key = self.key_for(request, policy, tier)
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            return self._respond(request, entry, policy, "HIT")
+
+        # Single flight: the first miss renders, concurrent misses wait and reuse it
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                entry = self.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return self._respond(request, entry, policy, "HIT")
+
+                self.misses += 1
+                response = await call_next(request)
+                body = b"".join([chunk async for chunk in response.body_iterator])
+                if not is_storable(response):
+                    passthrough = Response(content=body, status_code=response.status_code)
+                    passthrough.raw_headers = response.raw_headers  # keeps repeated headers (Set-Cookie)
+                    return passthrough
+
+                media_type = response.headers.get("content-type")
+                variants = precompress(body, media_type)
+                now = time.time()
+                entry = CachedResponse(
+                    body=body,
+                    media_type=media_type,
+                    etag=make_etag(body),
+                    stored_at=now,
+                    expires_at=now + policy.ttl,
+                    variants=variants,
+                )
+                self.put(key, entry)
+                return self._respond(request, entry, policy, "MISS")
+        finally:
+            # The lock outlives a release while others are queued on it, or a newcomer would
+            # create a second lock and render concurrently whenever nothing was stored
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                del self.waiters[key]
+                self.locks.pop(key, None)
+
+    def _respond(self, request: Request, entry: CachedResponse, policy: CachePolicy, status: str) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding")) if entry.variants else None
+        if encoding not in entry.variants:
+            encoding = None
+
+        remaining = max(0, int(entry.expires_at - time.time()))
+        headers = {
+            "ETag": entry.etag_for(encoding),
+            "Cache-Control": f"{'private' if policy.vary_tier else 'public'}, max-age={remaining}",
+            "Age": str(int(time.time() - entry.stored_at)),
+            "X-Cache": status,
+        }
+        if entry.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("if-none-match"), entry):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(content=entry.variants[encoding], media_type=entry.media_type, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
@@ -1,12 +1,17 @@
 """
 📡 RSS DISCOVERY MODULE
 Discovers news articles from Google News RSS and other feeds
+- All feeds are fetched concurrently over one shared keep-alive session (http_session.py)
+- Feeds go through the on-disk HTTP cache (http_cache.py): fresh feeds cost no request,
+  stale ones a conditional GET (ETag / Last-Modified), and offline runs replay them
+- URLs are deduplicated across queries and categories (first category wins)
 """
 
 import feedparser
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, quote
 from datetime import datetime, timedelta
+from http_cache import page_cache
 
 # 🌐 TRUSTED NEWS DOMAINS
 TRUSTED_DOMAINS = {
@@ -98,6 +103,16 @@ RSS_QUERIES = {
 }
 
 
+# ⚡ FETCHING
+MAX_FEED_WORKERS = 16   # feeds fetched at once (~30 queries in total)
+FEED_TIMEOUT = 10
+
+
+def google_news_rss_url(query, language="en", country="US"):
+    encoded_query = quote(query)
+    return f"https://news.google.com/rss/search?q={encoded_query}&hl={language}&gl={country}&ceid={country}:{language}"
+
+
 class NewsDiscovery:
     def __init__(self):
         self.all_trusted_domains = self._flatten_domains()
@@ -137,12 +152,13 @@ class NewsDiscovery:
         Fetch articles from Google News RSS for a specific query
         Returns list of article URLs
         """
-        # Google News RSS URL format
-        encoded_query = quote(query)
-        rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl={language}&gl={country}&ceid={country}:{language}"
+        rss_url = google_news_rss_url(query, language, country)
         
         try:
-            feed = feedparser.parse(rss_url)
+            response = page_cache.fetch(rss_url, session="feeds", timeout=FEED_TIMEOUT)
+            response.raise_for_status(rss_url)
+            
+            feed = feedparser.parse(response.body)
             articles = []
             
             for entry in feed.entries:
@@ -165,56 +181,80 @@ class NewsDiscovery:
             print(f"❌ Error fetching RSS for '{query}': {e}")
             return []
     
-    def discover_by_category(self, category, max_per_query=10):
+    def fetch_queries(self, queries):
         """
-        Discover articles for a specific category
-        Returns: list of trusted article URLs
+        Fetch many Google News RSS queries concurrently
+        Returns: dict of {query: [articles]}
         """
-        if category not in RSS_QUERIES:
-            print(f"⚠️  Category '{category}' not found")
-            return []
-        
-        queries = RSS_QUERIES[category]
-        discovered_urls = []
-        
-        print(f"\n🔍 Discovering {category} articles...")
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MAX_FEED_WORKERS, len(queries))) as pool:
+            return dict(zip(queries, pool.map(self.fetch_google_news_rss, queries)))
+    
+    def _collect(self, category, feeds, max_per_query, seen_urls):
+        """Pick a category's articles from fetched feeds, skipping URLs already claimed"""
+        discovered = []
         
-        for query in queries:
-            articles = self.fetch_google_news_rss(query)
+        for query in RSS_QUERIES[category]:
+            articles = feeds.get(query, [])
             
             # Filter to only trusted domains
             trusted_count = 0
             for article in articles[:max_per_query]:
                 # if self.is_trusted(article["url"]):
-                discovered_urls.append(article)
+                if article["url"] in seen_urls:
+                    continue
+                seen_urls.add(article["url"])
+                discovered.append(article)
                 trusted_count += 1
             
             print(f"   '{query}': found {trusted_count} trusted articles")
         
-        # Deduplicate by URL
-        unique_urls = {}
-        for article in discovered_urls:
-            unique_urls[article["url"]] = article
+        print(f"✅ {category}: {len(discovered)} unique trusted articles")
+        return discovered
+    
+    def discover_by_category(self, category, max_per_query=10, seen_urls=None):
+        """
+        Discover articles for a specific category
+        Returns: list of trusted article URLs
+        """
+        if category not in RSS_QUERIES:
+            print(f"⚠️  Category '{category}' not found")
+            return []
         
-        result = list(unique_urls.values())
-        print(f"✅ Total unique trusted articles: {len(result)}")
+        print(f"\n🔍 Discovering {category} articles...")
+        feeds = self.fetch_queries(RSS_QUERIES[category])
+        return self._collect(category, feeds, max_per_query, set() if seen_urls is None else seen_urls)
+    
+    def discover_categories(self, categories, max_per_query=10):
+        """
+        Discover articles for several categories with every feed fetched at once
+        Returns: dict of {category: [articles]}, each URL in at most one category
+        """
+        categories = [c for c in categories if c in RSS_QUERIES]
+        started = datetime.now()
+        feeds = self.fetch_queries(q for category in categories for q in RSS_QUERIES[category])
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"⚡ Fetched {len(feeds)} feeds in {elapsed:.1f}s")
         
-        return result
+        seen_urls = set()
+        all_discoveries = {}
+        for category in categories:
+            print(f"\n🔍 {category}")
+            all_discoveries[category] = self._collect(category, feeds, max_per_query, seen_urls)
+        return all_discoveries
     
     def discover_all_categories(self, max_per_query=10):
         """
         Discover articles across all categories
         Returns: dict of {category: [articles]}
         """
-        all_discoveries = {}
-        
         print("\n" + "="*70)
         print("📡 NEWS DISCOVERY - ALL CATEGORIES")
         print("="*70)
         
-        for category in RSS_QUERIES.keys():
-            articles = self.discover_by_category(category, max_per_query)
-            all_discoveries[category] = articles
+        all_discoveries = self.discover_categories(RSS_QUERIES.keys(), max_per_query)
         
         total = sum(len(articles) for articles in all_discoveries.values())
         print(f"\n🎯 Total articles discovered: {total}")
@@ -1,31 +1,60 @@
 """
 🤖 AUTONOMOUS NEWS SIGNAL ENGINE
 Complete pipeline: Discovery → Scrape → Classify → Score → Store
+Stages run concurrently, joined by bounded queues (see stream_stages.py): an article
+is stored seconds after its feed is discovered, and memory stays bounded by queue sizes
 """
 
-from rss_discovery import NewsDiscovery
-from enhanced_scraper import scrape_article
+from rss_discovery import NewsDiscovery, RSS_QUERIES, MAX_FEED_WORKERS
+from enhanced_scraper import scrape_article, fetch_page, classify_page
 from confidence_scorer import ConfidenceScorer
 from news_database import NewsDB
+from scrape_stage import ScrapeStage, MAX_CONCURRENCY
+from stream_stages import DONE, QUEUE_SIZE, run_stage, run_batch_stage, stage_queue
+from url_seen import UrlSeenSet
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import heapq
+import itertools
 import time
 from datetime import datetime
 import json
 
+# Workers per stage. Fetch is network-bound (politeness limits apply on top);
+# classify is CPU-bound HTML parsing. Store is a single batching worker that
+# owns the DB connection.
+STAGE_WORKERS = {
+    'fetch': MAX_CONCURRENCY,
+    'classify': 4,
+    'score': 1,
+}
+STORE_BATCH = 50          # articles per bulk INSERT from the store stage
+STORE_MAX_WAIT = 1.0      # ...or flush this long after the batch's first article arrived
+
 class NewsPipeline:
-    def __init__(self, delay_between_scrapes=2):
+    def __init__(self, delay_between_scrapes=2, max_concurrency=MAX_CONCURRENCY,
+                 stage_workers=None, queue_size=QUEUE_SIZE):
         self.discovery = NewsDiscovery()
         self.scorer = ConfidenceScorer()
         self.delay = delay_between_scrapes
+        self.scraper = ScrapeStage(scrape_article, max_concurrency=max_concurrency,
+                                   min_interval=delay_between_scrapes)
+        self.workers = {**STAGE_WORKERS, 'fetch': max_concurrency, **(stage_workers or {})}
+        self.queue_size = queue_size
         
         self.stats = {
             'discovered': 0,
+            'already_seen': 0,
             'scraped': 0,
             'failed_scrapes': 0,
             'stored': 0,
             'duplicates': 0,
+            'failed_stores': 0,
             'by_category': {},
             'by_tier': {1: 0, 2: 0, 3: 0}
         }
+        self.top_articles = []  # min-heap of the 5 highest-confidence articles seen
+        self._scored_seq = itertools.count()  # unique heap tiebreaker, so tier/title are never compared
     
     def run_full_pipeline(self, max_per_query=5, categories=None):
         """
@@ -41,108 +70,20 @@ class NewsPipeline:
         print("🤖 AUTONOMOUS NEWS SIGNAL ENGINE")
         print(f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*70)
-        
-        # Step 1: DISCOVERY
-        print("\n📡 PHASE 1: DISCOVERY")
-        print("-" * 70)
-        
-        if categories:
-            discovered = {}
-            for category in categories:
-                discovered[category] = self.discovery.discover_by_category(
-                    category, max_per_query
-                )
-        else:
-            discovered = self.discovery.discover_all_categories(max_per_query)
-        
-        total_discovered = sum(len(articles) for articles in discovered.values())
-        self.stats['discovered'] = total_discovered
-        
-        if total_discovered == 0:
-            print("\n⚠️  No articles discovered. Exiting.")
-            return self.stats
-        
-        # Step 2: SCRAPE & CLASSIFY
-        print(f"\n🔍 PHASE 2: SCRAPE & CLASSIFY ({total_discovered} articles)")
-        print("-" * 70)
-        
-        all_processed = []
-        
-        for category, articles in discovered.items():
-            print(f"\n📂 Processing {category} ({len(articles)} articles)...")
-            
-            for i, article_meta in enumerate(articles, 1):
-                url = article_meta['url']
-                
-                try:
-                    # Respectful delay
-                    if i > 1:
-                        time.sleep(self.delay)
-                    
-                    print(f"   [{i}/{len(articles)}] Scraping: {url[:60]}...")
-                    
-                    # Scrape
-                    scraped_data = scrape_article(url)
-                    self.stats['scraped'] += 1
-                    
-                    # Add to processed list
-                    all_processed.append(scraped_data)
-                    
-                    print(f"      ✅ Category: {scraped_data['category']} "
-                          f"({scraped_data['category_confidence']})")
-                    
-                except Exception as e:
-                    self.stats['failed_scrapes'] += 1
-                    print(f"      ❌ Failed: {str(e)[:60]}")
-        
-        # Step 3: CONFIDENCE SCORING
-        print(f"\n🎯 PHASE 3: CONFIDENCE SCORING ({len(all_processed)} articles)")
+        print(f"\n🌊 STREAMING: discover → fetch({self.workers['fetch']}) → classify({self.workers['classify']}) "
+              f"→ score({self.workers['score']}) → store(batches of {STORE_BATCH}), queues of {self.queue_size}")
         print("-" * 70)
         
-        scored_articles = []
-        for article in all_processed:
-            confidence_data = self.scorer.calculate_confidence(article)
+        with NewsDB() as db:
+            asyncio.run(self._stream(db, max_per_query, list(categories or RSS_QUERIES.keys())))
             
-            article['final_confidence'] = confidence_data['confidence']
-            article['confidence_breakdown'] = confidence_data['breakdown']
-            article['source_tier'] = confidence_data['tier']
+            if self.stats['discovered'] == 0:
+                print("\n⚠️  No articles discovered.")
+                return self.stats
             
-            scored_articles.append(article)
-            
-            # Update tier stats
-            tier = confidence_data['tier']
-            if tier:
-                self.stats['by_tier'][tier] = self.stats['by_tier'].get(tier, 0) + 1
-        
-        # Rank by confidence
-        scored_articles.sort(key=lambda x: x['final_confidence'], reverse=True)
-        
-        print(f"   Top 5 by confidence:")
-        for i, article in enumerate(scored_articles[:5], 1):
-            tier = article['source_tier']
-            conf = article['final_confidence']
-            print(f"   {i}. [{tier}] {article['title'][:50]}... (conf: {conf})")
-        
-        # Step 4: STORE IN DATABASE
-        print(f"\n💾 PHASE 4: STORING IN NEON DATABASE")
-        print("-" * 70)
-        
-        with NewsDB() as db:
-            for article in scored_articles:
-                # Override category_confidence with final_confidence
-                article['category_confidence'] = article['final_confidence']
-                
-                article_id, is_new = db.store_article(article)
-                
-                if is_new:
-                    self.stats['stored'] += 1
-                    
-                    # Update category stats
-                    category = article['category']
-                    self.stats['by_category'][category] = \
-                        self.stats['by_category'].get(category, 0) + 1
-                else:
-                    self.stats['duplicates'] += 1
+            print(f"\n   Top 5 by confidence:")
+            for i, (conf, _, tier, title) in enumerate(sorted(self.top_articles, reverse=True), 1):
+                print(f"   {i}. [{tier}] {title[:50]}... (conf: {conf})")
             
             print(f"\n✅ Stored: {self.stats['stored']} new articles")
             print(f"⚠️  Duplicates skipped: {self.stats['duplicates']}")
@@ -157,6 +98,121 @@ class NewsPipeline:
         
         return self.stats
     
+    # ─────────────────────────────────────────────────────
+    # STAGES
+    # ─────────────────────────────────────────────────────
+    
+    async def _stream(self, db, max_per_query, categories):
+        started = time.time()
+        first_stored = []
+        loop = asyncio.get_running_loop()
+        to_fetch, to_classify, to_score, to_store = (stage_queue(self.queue_size) for _ in range(4))
+        
+        with ThreadPoolExecutor(max_workers=MAX_FEED_WORKERS, thread_name_prefix="discover") as feed_pool, \
+             ThreadPoolExecutor(max_workers=self.workers['fetch'], thread_name_prefix="fetch") as fetch_pool, \
+             ThreadPoolExecutor(max_workers=self.workers['classify'], thread_name_prefix="classify") as cpu_pool, \
+             ThreadPoolExecutor(max_workers=1, thread_name_prefix="store") as db_pool:
+            limiter = self.scraper.limiter(fetch_pool)
+            # URLs stored by earlier runs are skipped before any HTTP request (Bloom filter + seen_urls)
+            seen = UrlSeenSet(db.conn)
+            await loop.run_in_executor(db_pool, seen.warm)
+            
+            # 1️⃣ DISCOVER: every feed at once; URLs are queued as each feed lands
+            async def discover():
+                queries = list(dict.fromkeys(q for c in categories if c in RSS_QUERIES for q in RSS_QUERIES[c]))
+                feeds = [loop.run_in_executor(feed_pool, self.discovery.fetch_google_news_rss, q) for q in queries]
+                seen_urls = set()
+                for feed in asyncio.as_completed(feeds):
+                    urls = []
+                    for article_meta in (await feed)[:max_per_query]:
+                        if article_meta['url'] in seen_urls:
+                            continue
+                        seen_urls.add(article_meta['url'])
+                        urls.append(article_meta['url'])
+                    self.stats['discovered'] += len(urls)
+                    fresh = await loop.run_in_executor(db_pool, seen.filter_new, urls) if urls else []
+                    self.stats['already_seen'] += len(urls) - len(fresh)
+                    for url in fresh:
+                        await to_fetch.put(url)
+                print(f"   📡 Discovery finished: {self.stats['discovered']} URLs from {len(queries)} feeds "
+                      f"({self.stats['already_seen']} already seen) in {time.time() - started:.1f}s")
+                await to_fetch.put(DONE)
+            
+            # 2️⃣ FETCH: network, under global + per-host politeness limits
+            async def fetch(url):
+                return url, await limiter.call(url, fetch_page, url)
+            
+            # 3️⃣ CLASSIFY: parse + category detection off the event loop
+            async def classify(fetched):
+                scraped_data = await loop.run_in_executor(cpu_pool, classify_page, *fetched)
+                self.stats['scraped'] += 1
+                print(f"   ✅ {scraped_data['category']} ({scraped_data['category_confidence']}): {fetched[0][:60]}")
+                return scraped_data
+            
+            # 4️⃣ SCORE
+            async def score(article):
+                confidence_data = self.scorer.calculate_confidence(article)
+                article['final_confidence'] = confidence_data['confidence']
+                article['confidence_breakdown'] = confidence_data['breakdown']
+                article['source_tier'] = confidence_data['tier']
+                
+                tier = confidence_data['tier']
+                if tier:
+                    self.stats['by_tier'][tier] = self.stats['by_tier'].get(tier, 0) + 1
+                
+                entry = (article['final_confidence'], next(self._scored_seq), tier, article['title'])
+                if len(self.top_articles) < 5:
+                    heapq.heappush(self.top_articles, entry)
+                else:
+                    heapq.heappushpop(self.top_articles, entry)
+                return article
+            
+            # 5️⃣ STORE: micro-batches, one bulk INSERT + commit each; the DB connection lives on its own thread
+            def persist(articles):
+                results = db.store_articles_batch(articles)
+                # Stored or confirmed duplicate; failed INSERTs stay unseen so the next run retries them
+                seen.mark([article['url'] for article, (_, is_new) in zip(articles, results) if is_new is not None])
+                return results
+            
+            async def store(articles):
+                for article in articles:
+                    # Override category_confidence with final_confidence
+                    article['category_confidence'] = article['final_confidence']
+                results = await loop.run_in_executor(db_pool, persist, articles)
+                
+                for article, (article_id, is_new) in zip(articles, results):
+                    if is_new:
+                        self.stats['stored'] += 1
+                        if not first_stored:
+                            first_stored.append(time.time() - started)
+                            print(f"   💾 First articles stored {first_stored[0]:.1f}s after start")
+                        category = article['category']
+                        self.stats['by_category'][category] = \
+                            self.stats['by_category'].get(category, 0) + 1
+                    elif is_new is None:
+                        self.stats['failed_stores'] += 1
+                    else:
+                        self.stats['duplicates'] += 1
+            
+            def failed(stage, item, error):
+                if stage in ('fetch', 'classify'):
+                    self.stats['failed_scrapes'] += 1
+                if isinstance(item, list):
+                    print(f"   ❌ {stage} failed for {len(item)} articles - {str(error)[:60]}")
+                    return
+                url = item if isinstance(item, str) else item[0] if isinstance(item, tuple) else item.get('url', '')
+                print(f"   ❌ {stage} failed: {url[:60]} - {str(error)[:60]}")
+            
+            await asyncio.gather(
+                discover(),
+                run_stage('fetch', to_fetch, to_classify, fetch, self.workers['fetch'], failed),
+                run_stage('classify', to_classify, to_score, classify, self.workers['classify'], failed),
+                run_stage('score', to_score, to_store, score, self.workers['score'], failed),
+                run_batch_stage('store', to_store, store, STORE_BATCH, STORE_MAX_WAIT, failed),
+            )
+        
+        print(f"\n   ⏱️ Pipeline drained in {time.time() - started:.1f}s")
+    
     def print_summary(self):
         """Print pipeline execution summary"""
         print("\n" + "="*70)
@@ -165,11 +221,12 @@ class NewsPipeline:
         
         print(f"\n📡 Discovery:")
         print(f"   Total articles discovered: {self.stats['discovered']}")
+        print(f"   Already seen (not scraped): {self.stats['already_seen']}")
         
         print(f"\n🔍 Scraping:")
         print(f"   ✅ Successful: {self.stats['scraped']}")
         print(f"   ❌ Failed: {self.stats['failed_scrapes']}")
-        scrape_rate = (self.stats['scraped'] / max(self.stats['discovered'], 1)) * 100
+        scrape_rate = (self.stats['scraped'] / max(self.stats['discovered'] - self.stats['already_seen'], 1)) * 100
         print(f"   Success rate: {scrape_rate:.1f}%")
         
         print(f"\n🏆 Source Tier Distribution:")
@@ -181,6 +238,7 @@ class NewsPipeline:
         print(f"\n💾 Database:")
         print(f"   ✅ New articles stored: {self.stats['stored']}")
         print(f"   ⚠️  Duplicates skipped: {self.stats['duplicates']}")
+        print(f"   ❌ Failed to store: {self.stats['failed_stores']}")
         
         if self.stats['by_category']:
             print(f"\n📂 By Category (new articles):")
@@ -0,0 +1,55 @@
+"""
+🔗 SHARED STATE
+Optional Redis connection shared by every worker process
+Set REDIS_URL to share rate limits and quotas across workers; without it each
+process falls back to its own in-memory state
+"""
+
+import os
+import time
+
+REDIS_URL = os.getenv("REDIS_URL")
+RETRY_AFTER_SECONDS = 30  # back off this long after a failed connection
+
+# Redis client - Made resilient
+REDIS_AVAILABLE = False
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+
+_client = None
+_failed_at = 0.0
+
+
+def redis_configured() -> bool:
+    """REDIS_URL is set and the client is installed (the server may still be unreachable)"""
+    return bool(REDIS_URL) and REDIS_AVAILABLE
+
+
+def get_redis():
+    """Return a connected Redis client, or None when Redis is not configured/reachable"""
+    global _client, _failed_at
+    if not REDIS_URL or not REDIS_AVAILABLE:
+        return None
+    if _client is not None:
+        return _client
+    if time.time() - _failed_at < RETRY_AFTER_SECONDS:
+        return None
+    try:
+        client = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+        client.ping()
+        _client = client
+        print("✅ Shared state connected to Redis")
+    except Exception as e:
+        print(f"⚠️ Redis unavailable, using in-process state: {e}")
+        _failed_at = time.time()
+    return _client
+
+
+def reset_redis():
+    """Drop the client after an error so the next call reconnects (after the back-off)"""
+    global _client, _failed_at
+    _client = None
+    _failed_at = time.time()
@@ -1,4 +1,4 @@
-import requests
+from http_session import get_session
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
@@ -8,7 +8,7 @@ HEADERS = {
 
 def scrape_article(url):
     # 1️⃣ Fetch
-    response = requests.get(url, headers=HEADERS, timeout=15)
+    response = get_session("scraper").get(url, headers=HEADERS, timeout=15)
     response.raise_for_status()
     html = response.text
 
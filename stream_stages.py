@@ -0,0 +1,96 @@
+"""
+🌊 STREAMING STAGES
+Minimal building blocks for pipelines of concurrent stages joined by bounded asyncio queues
+- A full queue blocks the stage feeding it (backpressure), so memory is bounded by queue sizes
+- DONE flows down the pipeline once a stage's input is exhausted and its workers have drained
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+DONE = object()  # end-of-stream marker
+
+QUEUE_SIZE = 32  # default bound for the queue between two stages
+
+
+def stage_queue(maxsize: int = QUEUE_SIZE) -> asyncio.Queue:
+    return asyncio.Queue(maxsize=maxsize)
+
+
+async def run_stage(name: str, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue],
+                    handle: Callable[[object], Awaitable[object]], workers: int = 1,
+                    on_error: Optional[Callable[[str, object, Exception], None]] = None):
+    """
+    Run `workers` copies of handle(item) over inbox until DONE.
+    Non-None results go to outbox; a failing item is reported and skipped, never fatal.
+    """
+    async def work():
+        while True:
+            item = await inbox.get()
+            if item is DONE:
+                inbox.put_nowait(DONE)  # wake sibling workers; the slot was just freed
+                return
+            try:
+                result = await handle(item)
+            except Exception as e:
+                if on_error:
+                    on_error(name, item, e)
+                continue
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(work() for _ in range(workers)))
+    if outbox is not None:
+        await outbox.put(DONE)
+
+
+async def _get_within(inbox: asyncio.Queue, timeout: float) -> Optional[object]:
+    """
+    Next item, or None once timeout expires with the queue still empty.
+    Unlike wait_for(inbox.get(), timeout), an item that lands as the timeout fires is returned,
+    not dropped: a cancelled get() leaves the queue untouched, and a get() that already won is kept.
+    """
+    if timeout <= 0:
+        return None
+    getter = asyncio.ensure_future(inbox.get())
+    try:
+        await asyncio.wait((getter,), timeout=timeout)
+    finally:
+        if not getter.done():
+            getter.cancel()
+            await asyncio.wait((getter,))
+    return None if getter.cancelled() else getter.result()
+
+
+async def run_batch_stage(name: str, inbox: asyncio.Queue,
+                          handle_batch: Callable[[List[object]], Awaitable[None]],
+                          max_batch: int = 50, max_wait: float = 1.0,
+                          on_error: Optional[Callable[[str, object, Exception], None]] = None):
+    """
+    Terminal stage that hands items to handle_batch in groups: a batch is flushed when it
+    reaches max_batch or max_wait seconds after its first item arrived, whichever is first.
+    """
+    loop = asyncio.get_running_loop()
+    finished = False
+    while not finished:
+        item = await inbox.get()
+        if item is DONE:
+            return
+        batch = [item]
+        deadline = loop.time() + max_wait
+        while len(batch) < max_batch:
+            try:
+                item = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                item = await _get_within(inbox, deadline - loop.time())
+                if item is None:
+                    break
+            if item is DONE:
+                finished = True
+                break
+            batch.append(item)
+        try:
+            await handle_batch(batch)
+        except Exception as e:
+            if on_error:
+                on_error(name, batch, e)
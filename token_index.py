@@ -0,0 +1,143 @@
+"""
+📇 TOKEN INDEX
+In-memory universe of scored DEX tokens, keyed by chain + token address
+- Refreshes upsert incrementally: only tokens whose values changed are re-encoded and re-positioned
+- Secondary sorted views (score, volume, liquidity) are kept ordered on every upsert
+- Filtered top-K queries walk a view (or the prefix of the most selective filter's view)
+  instead of re-sorting, so every limit/filter/sort combination is served from one dataset
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from fast_json import dumps
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+# Public sort names -> token field backing the sorted view
+SORT_FIELDS = {
+    "score": "zenith_score",
+    "volume": "volume_24h",
+    "liquidity": "liquidity_usd",
+}
+
+# A filter passing fewer than 1/SELECTIVE_RATIO of the universe is answered from its own
+# view's prefix plus a bounded heap, rather than walking the requested view from the top
+SELECTIVE_RATIO = 4
+
+Key = Tuple[str, str]
+_MAX_KEY: Key = ("\U0010ffff", "")  # sorts after every real key
+
+
+def token_key(token: dict) -> Key:
+    return (token.get("chain", "ethereum"), (token.get("address") or "").lower())
+
+
+class IndexedToken(NamedTuple):
+    token: dict
+    encoded: bytes      # token pre-serialized for envelope()
+    seen_at: float      # last refresh that returned this token
+
+
+class TokenIndex:
+    """Keyed token store with sorted views; safe to read while a refresh is upserting"""
+
+    def __init__(self, fields: Iterable[str] = SORT_FIELDS.values()):
+        self.fields = tuple(fields)
+        self.entries: Dict[Key, IndexedToken] = {}
+        # field -> [(-value, key)] ascending, i.e. value descending with a stable key tiebreak
+        self.views: Dict[str, List[Tuple[float, Key]]] = {field: [] for field in self.fields}
+        self.lock = threading.RLock()
+        self.refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ─────────────────────────────────────────────────────
+    # WRITES
+    # ─────────────────────────────────────────────────────
+
+    def upsert_many(self, tokens: Iterable[dict], now: float = None) -> int:
+        """Insert or update tokens; returns how many were new or changed"""
+        now = time.time() if now is None else now
+        changed = 0
+        with self.lock:
+            for token in tokens:
+                key = token_key(token)
+                previous = self.entries.get(key)
+                if previous is not None and previous.token == token:
+                    self.entries[key] = previous._replace(seen_at=now)
+                    continue
+                if previous is not None:
+                    self._unlink(key, previous.token)
+                self.entries[key] = IndexedToken(token, dumps(token), now)
+                for field in self.fields:
+                    insort(self.views[field], (-self._value(token, field), key))
+                changed += 1
+            self.refreshed_at = now
+        return changed
+
+    def expire(self, older_than: float) -> int:
+        """Drop tokens no refresh has returned since `older_than`"""
+        with self.lock:
+            stale = [key for key, entry in self.entries.items() if entry.seen_at < older_than]
+            for key in stale:
+                self._unlink(key, self.entries.pop(key).token)
+        return len(stale)
+
+    def _unlink(self, key: Key, token: dict):
+        for field in self.fields:
+            view = self.views[field]
+            item = (-self._value(token, field), key)
+            i = bisect_left(view, item)
+            if i < len(view) and view[i] == item:
+                del view[i]
+
+    @staticmethod
+    def _value(token: dict, field: str) -> float:
+        return float(token.get(field) or 0)
+
+    # ─────────────────────────────────────────────────────
+    # READS
+    # ─────────────────────────────────────────────────────
+
+    def top(self, limit: int, min_liquidity: float = 0, min_volume: float = 0,
+            sort_by: str = "zenith_score") -> List[bytes]:
+        """Pre-encoded top `limit` tokens by `sort_by` (descending) that pass both filters"""
+        if limit <= 0:
+            return []
+        filters = [(field, minimum) for field, minimum in
+                   (("liquidity_usd", min_liquidity), ("volume_24h", min_volume)) if minimum > 0]
+        with self.lock:
+            view = self.views[sort_by]
+            if not filters:
+                return [self.entries[key].encoded for _, key in view[:limit]]
+
+            # Tokens passing a filter are exactly a prefix of that filter's view
+            counts = [(self._count_at_least(field, minimum), field) for field, minimum in filters]
+            passing, field = min(counts)
+            if field != sort_by and passing * SELECTIVE_RATIO < len(view):
+                candidates = (key for _, key in self.views[field][:passing]
+                              if self._passes(key, filters))
+                keys = heapq.nsmallest(limit, candidates,
+                                       key=lambda k: (-self._value(self.entries[k].token, sort_by), k))
+            else:
+                keys = []
+                for _, key in view:
+                    if self._passes(key, filters):
+                        keys.append(key)
+                        if len(keys) >= limit:
+                            break
+            return [self.entries[key].encoded for key in keys]
+
+    def _count_at_least(self, field: str, minimum: float) -> int:
+        return bisect_right(self.views[field], (-minimum, _MAX_KEY))
+
+    def _passes(self, key: Key, filters: List[Tuple[str, float]]) -> bool:
+        token = self.entries[key].token
+        return all(self._value(token, field) >= minimum for field, minimum in filters)
@@ -7,10 +7,10 @@ No crashes - all operations are transactional
 import os
 import uuid
 import time
-import requests
+import base64
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional, List
+from typing import Optional, List, Iterator
 from pydantic import BaseModel, Field
 
 import psycopg2
@@ -19,6 +19,17 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from activity_tracker import ActivityTracker
+from upstream_scheduler import upstream, Priority
+
+# Vectorized performance metrics (needs NumPy)
+ANALYTICS_AVAILABLE = False
+try:
+    from portfolio_analytics import get_performance_metrics
+    ANALYTICS_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Portfolio analytics not available: {e}")
+
 # ═══════════════════════════════════════════════════════
 # DATABASE CONNECTION
 # ═══════════════════════════════════════════════════════
@@ -85,6 +96,36 @@ class PortfolioResponse(BaseModel):
 PRICE_CACHE = {}
 CACHE_TTL = 10  # seconds
 
+ASSET_NAME_CACHE = {"names": {}, "timestamp": 0}
+ASSET_NAME_TTL = 300  # seconds - asset list rarely changes
+
+
+# ═══════════════════════════════════════════════════════
+# PORTFOLIO READ MODEL (per-session cache)
+# ═══════════════════════════════════════════════════════
+
+# session_id -> (portfolio dict, user_id, cached_at)
+PORTFOLIO_CACHE = {}
+PORTFOLIO_CACHE_TTL = 5  # seconds - bounds staleness from price moves and other workers
+PORTFOLIO_CACHE_MAX = 5000
+
+# Deferred last_active writes (flushed in batches on a background thread)
+activity = ActivityTracker(get_db_connection)
+
+
+def invalidate_portfolio(session_id: str):
+    """Drop a cached portfolio - call after anything that changes it (trades, triggers)"""
+    PORTFOLIO_CACHE.pop(session_id, None)
+
+
+def _prune_portfolio_cache(now: float):
+    """Evict expired entries once the cache grows past its cap"""
+    if len(PORTFOLIO_CACHE) < PORTFOLIO_CACHE_MAX:
+        return
+    expired = [sid for sid, (_, _, ts) in PORTFOLIO_CACHE.items() if now - ts >= PORTFOLIO_CACHE_TTL]
+    for sid in expired:
+        PORTFOLIO_CACHE.pop(sid, None)
+
 
 def get_asset_price(symbol: str, asset_type: str = "crypto") -> float:
     """Get current price for an asset with caching"""
@@ -120,9 +161,8 @@ def get_dexscreener_price(symbol: str) -> Optional[float]:
     try:
         # Search for the token
         url = f"https://api.dexscreener.com/latest/dex/search?q={symbol}"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        data = upstream.fetch("dexscreener", url, Priority.TRADE, ttl=CACHE_TTL)
+        if data:
             pairs = data.get('pairs', [])
             if pairs:
                 # Get priceUsd from the most liquid pair
@@ -137,9 +177,8 @@ def get_alpha_vantage_price(symbol: str) -> Optional[float]:
     api_key = os.getenv("ALPHA_VANTAGE_KEY", "27PTDI7FTSYLQI4F")
     try:
         url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        data = upstream.fetch("alphavantage", url, Priority.TRADE, ttl=CACHE_TTL)
+        if data:
             quote = data.get('Global Quote', {})
             if quote:
                 return float(quote.get('05. price', 0))
@@ -175,6 +214,8 @@ class TradingEngine:
     
     def __enter__(self):
         self.conn = get_db_connection()
+        # Reads run outside transactions; execute_trade opens its own
+        self.conn.autocommit = True
         self.cur = self.conn.cursor()
         return self
     
@@ -189,15 +230,29 @@ class TradingEngine:
     # ─────────────────────────────────────────────────────
     
     def get_or_create_user(self, session_id: str) -> dict:
-        """Get existing user or create new one with $10,000"""
-        self.cur.execute("""
-            INSERT INTO trading_users (session_id, wallet_balance, available_margin, portfolio_value)
-            VALUES (%s, 10000.00, 10000.00, 10000.00)
-            ON CONFLICT (session_id) DO UPDATE SET last_active = CURRENT_TIMESTAMP
-            RETURNING *
-        """, (session_id,))
-        user = dict(self.cur.fetchone())
-        self.conn.commit()
+        """
+        Get existing user or create new one with $10,000.
+        Existing users are a plain read; their last_active bump is batched by `activity`.
+        """
+        self.cur.execute("SELECT * FROM trading_users WHERE session_id = %s", (session_id,))
+        row = self.cur.fetchone()
+        
+        if not row:
+            self.cur.execute("""
+                INSERT INTO trading_users (session_id, wallet_balance, available_margin, portfolio_value)
+                VALUES (%s, 10000.00, 10000.00, 10000.00)
+                ON CONFLICT (session_id) DO NOTHING
+                RETURNING *
+            """, (session_id,))
+            row = self.cur.fetchone()
+            if not row:
+                # Lost a creation race with another request
+                self.cur.execute("SELECT * FROM trading_users WHERE session_id = %s", (session_id,))
+                row = self.cur.fetchone()
+            self.conn.commit()
+        
+        user = dict(row)
+        activity.touch(user['id'])
         return user
     
     def get_user_with_lock(self, session_id: str) -> dict:
@@ -370,6 +425,7 @@ class TradingEngine:
             
             # 8. Commit transaction
             self.conn.commit()
+            invalidate_portfolio(request.session_id)
             
             return TradeResponse(
                 success=True,
@@ -385,6 +441,8 @@ class TradingEngine:
             self.conn.rollback()
             return TradeResponse(success=False, message=f"Trade failed: {str(e)}")
         finally:
+            # Validation failures return early - release the row lock before leaving the transaction
+            self.conn.rollback()
             self.conn.autocommit = True
     
     def _execute_buy(self, user_id: int, asset_id: int, symbol: str,
@@ -577,11 +635,17 @@ class TradingEngine:
     # ─────────────────────────────────────────────────────
     
     def get_portfolio(self, session_id: str) -> dict:
-        """Get complete portfolio for a user"""
+        """Get complete portfolio for a user (served from PORTFOLIO_CACHE when fresh)"""
+        now = time.time()
+        cached = PORTFOLIO_CACHE.get(session_id)
+        if cached and now - cached[2] < PORTFOLIO_CACHE_TTL:
+            activity.touch(cached[1])
+            return cached[0]
+        
         user = self.get_or_create_user(session_id)
         holdings = self.get_user_holdings(user['id'])
         
-        return {
+        portfolio = {
             "session_id": session_id,
             "wallet_balance": float(user['wallet_balance']),
             "portfolio_value": float(user['portfolio_value']),
@@ -594,6 +658,10 @@ class TradingEngine:
             "win_rate": float(user['win_rate']),
             "holdings": holdings
         }
+        
+        _prune_portfolio_cache(now)
+        PORTFOLIO_CACHE[session_id] = (portfolio, user['id'], now)
+        return portfolio
     
     def get_leaderboard(self, limit: int = 10) -> List[dict]:
         """Get top traders by portfolio value"""
@@ -612,18 +680,115 @@ class TradingEngine:
         """, (limit,))
         return [dict(row) for row in self.cur.fetchall()]
     
-    def get_trade_history(self, session_id: str, limit: int = 50) -> List[dict]:
-        """Get trade history for a user"""
+    def get_performance(self, session_id: str) -> dict:
+        """Get Sharpe/Sortino/volatility/beta/rolling returns for a user"""
         user = self.get_or_create_user(session_id)
+        metrics = None
+        if ANALYTICS_AVAILABLE:
+            metrics = get_performance_metrics(self.conn, [user['id']]).get(user['id'])
+        return {"session_id": session_id, "performance": metrics}
+    
+    def get_leaderboard_performance(self, limit: int = 10) -> List[dict]:
+        """Leaderboard with performance metrics batch-computed for all listed traders"""
         self.cur.execute("""
-            SELECT t.*, a.name as asset_name
-            FROM trading_trades t
-            JOIN trading_assets a ON t.asset_id = a.id
-            WHERE t.user_id = %s
-            ORDER BY t.executed_at DESC
+            SELECT 
+                id,
+                COALESCE(username, 'Trader #' || id) as display_name,
+                portfolio_value,
+                total_pnl,
+                total_trades,
+                win_rate,
+                RANK() OVER (ORDER BY portfolio_value DESC) as rank
+            FROM trading_users
+            WHERE portfolio_value > 0
+            ORDER BY portfolio_value DESC
             LIMIT %s
-        """, (user['id'], limit))
-        return [dict(row) for row in self.cur.fetchall()]
+        """, (limit,))
+        rows = [dict(row) for row in self.cur.fetchall()]
+        
+        metrics = {}
+        if ANALYTICS_AVAILABLE and rows:
+            metrics = get_performance_metrics(self.conn, [row['id'] for row in rows])
+        
+        for row in rows:
+            row['performance'] = metrics.get(row.pop('id'))
+        return rows
+    
+    def get_asset_names(self) -> dict:
+        """Symbol -> display name map, cached instead of joining trading_assets per trade"""
+        now = time.time()
+        if now - ASSET_NAME_CACHE["timestamp"] > ASSET_NAME_TTL:
+            self.cur.execute("SELECT symbol, name FROM trading_assets")
+            ASSET_NAME_CACHE["names"] = {row['symbol']: row['name'] for row in self.cur.fetchall()}
+            ASSET_NAME_CACHE["timestamp"] = now
+        return ASSET_NAME_CACHE["names"]
+    
+    def get_user_id(self, session_id: str) -> Optional[int]:
+        """Look up a user id without creating the user"""
+        self.cur.execute("SELECT id FROM trading_users WHERE session_id = %s", (session_id,))
+        row = self.cur.fetchone()
+        return row['id'] if row else None
+    
+    def get_trade_history(self, session_id: str, limit: int = 50,
+                          cursor: Optional[str] = None) -> List[dict]:
+        """
+        Get one page of trade history for a user, newest first.
+        Pass the cursor of the last row of a page to fetch the next one (keyset
+        pagination on (executed_at, id), served by idx_trading_trades_user_time).
+        """
+        user = self.get_or_create_user(session_id)
+        
+        if cursor:
+            executed_at, trade_id = decode_trade_cursor(cursor)
+            self.cur.execute("""
+                SELECT * FROM trading_trades
+                WHERE user_id = %s AND (executed_at, id) < (%s, %s)
+                ORDER BY executed_at DESC, id DESC
+                LIMIT %s
+            """, (user['id'], executed_at, trade_id, limit))
+        else:
+            self.cur.execute("""
+                SELECT * FROM trading_trades
+                WHERE user_id = %s
+                ORDER BY executed_at DESC, id DESC
+                LIMIT %s
+            """, (user['id'], limit))
+        
+        rows = self.cur.fetchall()
+        names = self.get_asset_names()
+        trades = []
+        for row in rows:
+            trade = dict(row)
+            trade['asset_name'] = names.get(trade['symbol'])
+            trade['cursor'] = encode_trade_cursor(trade['executed_at'], trade['id'])
+            trades.append(trade)
+        return trades
+    
+    def iter_trade_history(self, user_id: int, batch_size: int = 500) -> Iterator[dict]:
+        """
+        Stream a user's full trade history through a server-side cursor.
+        Only `batch_size` rows are held in memory at a time.
+        """
+        names = self.get_asset_names()
+        if self.conn.autocommit:
+            self.conn.autocommit = False  # named cursors live inside a transaction
+        stream = self.conn.cursor(name=f"trade_export_{user_id}_{uuid.uuid4().hex[:8]}",
+                                  cursor_factory=RealDictCursor)
+        stream.itersize = batch_size
+        try:
+            stream.execute("""
+                SELECT * FROM trading_trades
+                WHERE user_id = %s
+                ORDER BY executed_at DESC, id DESC
+            """, (user_id,))
+            for row in stream:
+                trade = dict(row)
+                trade['asset_name'] = names.get(trade['symbol'])
+                yield trade
+        finally:
+            stream.close()
+            self.conn.rollback()
+            self.conn.autocommit = True
 
     def get_analytics(self, session_id: str) -> dict:
         """Get advanced analytics for a user"""
@@ -688,9 +853,15 @@ class TradingEngine:
             dd = peak_pnl - current_pnl
             max_drawdown = max(max_drawdown, dd)
 
+        # 3. Risk/return metrics from the equity curve
+        performance = None
+        if ANALYTICS_AVAILABLE:
+            performance = get_performance_metrics(self.conn, [user_id]).get(user_id)
+
         return {
             "session_id": session_id,
             "exposure": exposure,
+            "performance": performance,
             "metrics": {
                 "longest_win_streak": longest_win_streak,
                 "longest_loss_streak": longest_loss_streak,
@@ -702,6 +873,26 @@ class TradingEngine:
         }
 
 
+# ═══════════════════════════════════════════════════════
+# TRADE HISTORY CURSORS
+# ═══════════════════════════════════════════════════════
+
+def encode_trade_cursor(executed_at: datetime, trade_id: int) -> str:
+    """Opaque keyset cursor for (executed_at, id)"""
+    raw = f"{executed_at.isoformat()}|{trade_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_trade_cursor(cursor: str) -> tuple:
+    """Inverse of encode_trade_cursor - raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        executed_at, trade_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(executed_at), int(trade_id)
+    except Exception:
+        raise ValueError("Invalid history cursor")
+
+
 # ═══════════════════════════════════════════════════════
 # STOP-LOSS / TAKE-PROFIT ENGINE
 # ═══════════════════════════════════════════════════════
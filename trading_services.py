@@ -7,16 +7,20 @@
 
 import os
 import asyncio
-import json
 import time
 from datetime import datetime, timedelta
-from typing import Set, Dict
+from typing import Set, Dict, Optional
 from contextlib import asynccontextmanager
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
+from trading_engine import invalidate_portfolio, activity
+from activity_tracker import ACTIVE_WINDOW
+from fast_json import dumps_str
+from upstream_scheduler import upstream, Priority
+
 load_dotenv()
 
 # ═══════════════════════════════════════════════════════
@@ -44,8 +48,6 @@ def get_db_connection():
 # PRICE CACHE (shared with main trading engine)
 # ═══════════════════════════════════════════════════════
 
-import requests
-
 PRICE_CACHE: Dict[str, tuple] = {}
 CACHE_TTL = 5  # seconds
 
@@ -70,10 +72,11 @@ async def fetch_crypto_prices() -> Dict[str, float]:
         url = f"https://api.coingecko.com/api/v3/simple/price?ids={ids}&vs_currencies=usd&include_24hr_change=true"
         
         loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.get(url, timeout=10))
+        data = await loop.run_in_executor(
+            None, lambda: upstream.fetch("coingecko", url, Priority.BACKGROUND, ttl=30, timeout=10)
+        )
         
-        if response.status_code == 200:
-            data = response.json()
+        if data:
             prices = {}
             for symbol, cg_id in COINGECKO_IDS.items():
                 if cg_id in data:
@@ -165,6 +168,7 @@ async def check_triggers():
                         float(holding['margin_used']),
                         trigger_type
                     )
+                    invalidate_portfolio(holding['session_id'])
                     triggered_trades.append({
                         'session_id': holding['session_id'],
                         'symbol': symbol,
@@ -263,27 +267,59 @@ async def execute_trigger_trade(conn, cur, user_id: int, asset_id: int, symbol:
 # PORTFOLIO HISTORY SNAPSHOTS
 # ═══════════════════════════════════════════════════════
 
-async def snapshot_portfolios():
+# S&P 500 benchmark for beta in portfolio_analytics. Alpha Vantage has no index quotes; the
+# SPY ETF tracks SPX and beta only uses returns. Kept out of trading_assets - it isn't tradeable.
+BENCHMARK_SYMBOL = "SPY"
+
+
+async def fetch_benchmark_price() -> Optional[float]:
+    """Latest S&P 500 benchmark quote, or None (beta skips snapshots without one)"""
+    try:
+        api_key = os.getenv("ALPHA_VANTAGE_KEY", "27PTDI7FTSYLQI4F")
+        url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={BENCHMARK_SYMBOL}&apikey={api_key}"
+        
+        loop = asyncio.get_event_loop()
+        data = await loop.run_in_executor(
+            None, lambda: upstream.fetch("alphavantage", url, Priority.BACKGROUND, ttl=60, timeout=10)
+        )
+        
+        price = float((data or {}).get('Global Quote', {}).get('05. price', 0))
+        return price if price > 0 else None
+    except Exception as e:
+        print(f"⚠️ Benchmark quote error: {e}")
+    return None
+
+
+async def snapshot_portfolios(tracker=None):
     """Take a snapshot of all portfolio values for charting"""
+    tracker = tracker or activity
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
-        # Get all active users (active in last 24 hours)
+        # Get all active users (active in last 24 hours). last_active is shared by every
+        # worker; write this worker's buffered touches first so they are included.
+        tracker.flush()
         cur.execute("""
             SELECT id, wallet_balance, portfolio_value, total_pnl
             FROM trading_users
-            WHERE last_active > NOW() - INTERVAL '24 hours'
-        """)
+            WHERE last_active > NOW() - make_interval(secs => %s)
+        """, (ACTIVE_WINDOW,))
         
         users = cur.fetchall()
         
+        # Benchmark prices recorded alongside each snapshot (for beta in portfolio_analytics)
+        cur.execute("SELECT current_price FROM trading_assets WHERE symbol = 'BTC'")
+        btc = cur.fetchone()
+        spx_price = await fetch_benchmark_price() if users else None
+        
         for user in users:
             cur.execute("""
                 INSERT INTO trading_portfolio_history
-                (user_id, portfolio_value, wallet_balance, total_pnl)
-                VALUES (%s, %s, %s, %s)
-            """, (user['id'], user['portfolio_value'], user['wallet_balance'], user['total_pnl']))
+                (user_id, portfolio_value, wallet_balance, total_pnl, btc_price, spx_price)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (user['id'], user['portfolio_value'], user['wallet_balance'], user['total_pnl'],
+                  btc['current_price'] if btc else None, spx_price))
         
         conn.commit()
         conn.close()
@@ -420,7 +456,7 @@ class WebSocketBroadcaster:
     
     async def broadcast_prices(self, prices: Dict):
         """Broadcast price updates to all price subscribers"""
-        message = json.dumps({
+        message = dumps_str({
             'type': 'price_update',
             'data': prices,
             'timestamp': datetime.now().isoformat()
@@ -441,7 +477,7 @@ class WebSocketBroadcaster:
         if session_id not in self.clients:
             return
         
-        message = json.dumps(data)
+        message = dumps_str(data)
         dead_sockets = set()
         
         for ws in self.clients[session_id]:
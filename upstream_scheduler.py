@@ -0,0 +1,376 @@
+"""
+📡 UPSTREAM SCHEDULER
+Quota-aware gateway for third-party market data APIs (Alpha Vantage, CoinGecko, DexScreener)
+- Per-provider token buckets sized to each provider's published limits
+- Priority queueing: trade execution > charts/quotes > list pages > background jobs
+- Deadlines: a request that can't get a token in time gives up instead of piling up
+- Shared result cache with in-flight de-duplication (and stale answers when a call fails)
+- Circuit breakers, latency-percentile timeouts and hedged requests for trade pricing
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from enum import IntEnum
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import requests
+
+from http_session import get_session
+
+
+class Priority(IntEnum):
+    TRADE = 0       # pricing a trade the user is executing
+    CHART = 1       # single-asset quotes and charts
+    LIST = 2        # market overview pages (forex, commodities, trending)
+    BACKGROUND = 3  # cron refreshes and snapshot loops
+
+
+class ProviderLimits(NamedTuple):
+    rate: float      # tokens added per `period`
+    period: float    # seconds
+    burst: int       # bucket capacity
+
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+PROVIDERS: Dict[str, ProviderLimits] = {
+    # Free key: 5 requests/minute
+    "alphavantage": ProviderLimits(float(os.getenv("ALPHA_VANTAGE_RPM", "5")), 60, 5),
+    # Public API: ~30 requests/minute
+    "coingecko": ProviderLimits(float(os.getenv("COINGECKO_RPM", "30")), 60, 10),
+    # 300 requests/minute on search/pairs endpoints
+    "dexscreener": ProviderLimits(300, 60, 30),
+}
+
+# Tokens held back from each priority so higher-priority work is never starved by lists
+PRIORITY_RESERVE = {
+    Priority.TRADE: 0,
+    Priority.CHART: 0,
+    Priority.LIST: 1,
+    Priority.BACKGROUND: 2,
+}
+
+DEFAULT_DEADLINES = {
+    Priority.TRADE: 8.0,
+    Priority.CHART: 4.0,
+    Priority.LIST: 1.5,
+    Priority.BACKGROUND: 30.0,
+}
+
+RESULT_CACHE_MAX = 5000
+STALE_GRACE = 3600  # seconds a failed refresh may still be answered from an expired entry
+
+# Alpha Vantage answers 200 with one of these keys when the quota is gone
+THROTTLE_KEYS = ("Note", "Information")
+
+# Circuit breaker: open after this many consecutive failures, probe again after the cool-down
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30  # seconds
+
+# Adaptive timeouts: a multiple of recent p95 latency, clamped to [MIN, caller's timeout]
+LATENCY_SAMPLES = 200
+MIN_SAMPLES = 20
+TIMEOUT_P95_MULTIPLIER = 3.0
+MIN_TIMEOUT = 0.5
+
+# Hedging: if a TRADE-priority call is slower than the provider's p95, race a second copy
+HEDGE_PRIORITIES = (Priority.TRADE,)
+HEDGE_WORKERS = 8
+
+
+class UpstreamDeadline(Exception):
+    """No provider token became available before the request's deadline"""
+
+
+# _attempt result for a rate-limited reply: no data, but no verdict on the provider's health
+THROTTLED = object()
+
+
+class TokenBucket:
+    """Token bucket whose tokens are handed out in priority order"""
+
+    def __init__(self, limits: ProviderLimits):
+        self.limits = limits
+        self.tokens = float(limits.burst)
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+        self.waiting = []  # heap of (priority, seq)
+        self.seq = itertools.count()
+
+    def _refill(self, now: float):
+        rate = self.limits.rate / self.limits.period
+        self.tokens = min(self.limits.burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def acquire(self, priority: Priority, deadline: float):
+        """Block until this request is first in line and a token is free, or raise UpstreamDeadline"""
+        # Never reserve the whole bucket, or small buckets would starve low priorities forever
+        reserve = min(PRIORITY_RESERVE[priority], self.limits.burst - 1)
+        with self.cond:
+            ticket = (int(priority), next(self.seq))
+            heapq.heappush(self.waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self.waiting[0] == ticket and self.tokens >= 1 + reserve:
+                        self.tokens -= 1
+                        return
+                    if now >= deadline:
+                        raise UpstreamDeadline()
+                    needed = 1 + reserve - self.tokens
+                    wait = needed * self.limits.period / self.limits.rate if needed > 0 else deadline - now
+                    self.cond.wait(timeout=max(0.01, min(wait, deadline - now)))
+            finally:
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.cond.notify_all()
+
+    def available(self) -> float:
+        """Tokens in the bucket right now, including what accrued since the last acquire"""
+        with self.cond:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def drain(self):
+        """Provider told us we're over quota - stop spending until the bucket refills"""
+        with self.cond:
+            self.tokens = min(self.tokens, 0.0)
+
+
+class CircuitBreaker:
+    """closed -> open after repeated failures -> half_open probe after cool-down -> closed"""
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self.probing = False
+            if self.state == "half_open" and not self.probing:
+                self.probing = True  # exactly one probe at a time
+                return True
+            return False
+
+    def release(self):
+        """Give back a half-open probe slot without judging the provider"""
+        with self.lock:
+            self.probing = False
+
+    def record(self, ok: bool):
+        with self.lock:
+            if ok:
+                self.state, self.failures, self.probing = "closed", 0, False
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    print(f"🔌 Circuit opened after {self.failures} failures")
+                self.state, self.opened_at, self.probing = "open", time.monotonic(), False
+
+
+class LatencyTracker:
+    """Recent successful call latencies for one provider"""
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def timeout(self, ceiling: float) -> float:
+        """p95 x multiplier, never above the caller's timeout"""
+        p95 = self.percentile(95)
+        if p95 is None:
+            return ceiling
+        return max(MIN_TIMEOUT, min(ceiling, p95 * TIMEOUT_P95_MULTIPLIER))
+
+
+class UpstreamScheduler:
+    """Shared entry point for every outbound market-data call"""
+
+    def __init__(self, providers: Dict[str, ProviderLimits] = PROVIDERS):
+        self.buckets = {name: TokenBucket(limits) for name, limits in providers.items()}
+        self.breakers = {name: CircuitBreaker() for name in providers}
+        self.latency = {name: LatencyTracker() for name in providers}
+        self.hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="upstream-hedge")
+        self.cache: Dict[str, Tuple[Any, float]] = {}  # key -> (value, expires_at)
+        self.inflight: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "cache_hits": 0, "deadline_misses": 0, "throttled": 0,
+                      "short_circuited": 0, "hedged": 0}
+
+    def fetch(self, provider: str, url: str, priority: Priority = Priority.LIST,
+              ttl: float = 60, deadline: Optional[float] = None, timeout: float = 5,
+              parse: Callable[[requests.Response], Any] = None, cache_key: Optional[str] = None) -> Any:
+        """
+        GET `url` through `provider`'s bucket and return the parsed JSON (or parse(response)).
+        Returns None when the call fails or misses its deadline and nothing is cached.
+        """
+        key = cache_key or url
+        now = time.time()
+        cached = self.cache.get(key)
+        if cached and now < cached[1]:
+            self.stats["cache_hits"] += 1
+            return cached[0]
+
+        # Same URL already being fetched by another thread - wait for its answer
+        with self.lock:
+            event = self.inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self.inflight[key] = threading.Event()
+        if not leader:
+            event.wait(timeout=DEFAULT_DEADLINES[priority] if deadline is None else deadline)
+            cached = self.cache.get(key)
+            return cached[0] if cached and time.time() < cached[1] + STALE_GRACE else None
+
+        try:
+            value = self._call(provider, url, priority, deadline, timeout, parse)
+            if value is not None:
+                self._store(key, value, ttl)
+                return value
+            # Stale-if-error: an old answer beats mock data
+            if cached and now < cached[1] + STALE_GRACE:
+                return cached[0]
+            return None
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            event.set()
+
+    def _call(self, provider, url, priority, deadline, timeout, parse):
+        breaker = self.breakers[provider]
+        if not breaker.allow():
+            self.stats["short_circuited"] += 1
+            return None
+
+        bucket = self.buckets[provider]
+        budget = deadline if deadline is not None else DEFAULT_DEADLINES[priority]
+        try:
+            bucket.acquire(priority, time.monotonic() + budget)
+        except UpstreamDeadline:
+            self.stats["deadline_misses"] += 1
+            breaker.release()  # no verdict on the provider
+            return None
+
+        timeout = self.latency[provider].timeout(timeout)
+        hedge_after = self.latency[provider].percentile(95) if priority in HEDGE_PRIORITIES else None
+        if hedge_after is None or hedge_after >= timeout:
+            value = self._attempt(provider, url, timeout, parse)
+        else:
+            value = self._hedged(provider, url, timeout, hedge_after, parse)
+        if value is THROTTLED:
+            breaker.release()  # rate limiting is not an outage - don't trip the breaker
+            return None
+        breaker.record(value is not None)
+        return value
+
+    def _hedged(self, provider, url, timeout, hedge_after, parse):
+        """Start a second identical call if the first is slower than p95; first success wins"""
+        started = time.monotonic()
+        futures = {self.hedge_pool.submit(self._attempt, provider, url, timeout, parse)}
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            try:
+                # Only hedge with a token that is free right now
+                self.buckets[provider].acquire(Priority.TRADE, time.monotonic())
+                futures.add(self.hedge_pool.submit(self._attempt, provider, url, timeout, parse))
+                self.stats["hedged"] += 1
+            except UpstreamDeadline:
+                pass
+
+        pending = set(futures)
+        throttled_only = True
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                throttled_only = False
+                break
+            for future in done:
+                value = future.result()
+                if value is THROTTLED:
+                    continue
+                if value is not None:
+                    return value
+                throttled_only = False
+        return THROTTLED if throttled_only else None
+
+    def _attempt(self, provider, url, timeout, parse):
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        try:
+            response = get_session("market").get(url, timeout=timeout)
+            if response.status_code == 429:
+                self.stats["throttled"] += 1
+                self.buckets[provider].drain()
+                return THROTTLED
+            if response.status_code != 200:
+                return None
+            if parse:
+                value = parse(response)
+            else:
+                value = response.json()
+                if isinstance(value, dict) and any(k in value for k in THROTTLE_KEYS):
+                    self.stats["throttled"] += 1
+                    self.buckets[provider].drain()
+                    return THROTTLED
+            self.latency[provider].add(time.monotonic() - started)
+            return value
+        except Exception as e:
+            print(f"⚠️ Upstream {provider} error: {e}")
+            return None
+
+    def health(self) -> Dict[str, dict]:
+        """Breaker state and latency profile per provider (for /api/v1/health)"""
+        report = {}
+        for name, breaker in self.breakers.items():
+            tracker = self.latency[name]
+            p50, p95 = tracker.percentile(50), tracker.percentile(95)
+            report[name] = {
+                "breaker": breaker.state,
+                "consecutive_failures": breaker.failures,
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "timeout_s": round(tracker.timeout(10.0), 2),
+                "tokens": round(self.buckets[name].available(), 2),
+            }
+        return report
+
+    def _store(self, key: str, value: Any, ttl: float):
+        with self.lock:
+            if len(self.cache) >= RESULT_CACHE_MAX:
+                now = time.time()
+                for k in [k for k, (_, exp) in self.cache.items() if now >= exp + STALE_GRACE]:
+                    del self.cache[k]
+                if len(self.cache) >= RESULT_CACHE_MAX:
+                    self.cache.clear()
+            self.cache[key] = (value, time.time() + ttl)
+
+
+# Process-wide instance shared by merged_api, trading_engine and trading_services
+upstream = UpstreamScheduler()
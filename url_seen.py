@@ -0,0 +1,175 @@
+"""
+👀 URL SEEN-SET
+Skips scraping URLs the pipeline has already processed
+- URLs are normalized (case, www., default ports, fragments, tracking params, param order)
+- seen_urls (Postgres) is the source of truth; an in-memory Bloom filter warmed from it
+  answers "definitely new" without a query, so only likely repeats cost a (batched) lookup
+- On first use the table is backfilled from the URLs already in articles
+"""
+
+import hashlib
+import math
+from typing import Iterable, List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from psycopg2.extras import execute_values
+
+# ═══════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════
+
+BLOOM_CAPACITY = 500_000   # URLs the filter is sized for before its error rate degrades
+BLOOM_ERROR_RATE = 0.001
+RETENTION_DAYS = 90        # older seen_urls rows are neither warmed nor kept
+
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ocid", "cmpid", "oc", "ref", "smid"}
+
+SEEN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_urls (
+    url_hash CHAR(32) PRIMARY KEY,
+    url TEXT NOT NULL,
+    first_seen TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used for seen-set membership"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/") or "/"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    # http/https serve the same article
+    return urlunsplit(("https" if scheme == "http" else scheme, host, path, urlencode(query), ""))
+
+
+def url_hash(url: str) -> str:
+    """128-bit hex digest of the normalized URL"""
+    return hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over hex digests (k positions by double hashing)"""
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: str):
+        h1 = int(digest[:16], 16)
+        h2 = int(digest[16:], 16) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest: str):
+        for pos in self._positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class UrlSeenSet:
+    """Seen-set over a psycopg2 connection; call from one thread at a time"""
+
+    def __init__(self, conn, capacity: int = BLOOM_CAPACITY):
+        self.conn = conn
+        self.bloom = BloomFilter(capacity)
+        self.warmed = False
+        self.skipped = 0
+
+    # ─────────────────────────────────────────────────────
+    # STARTUP
+    # ─────────────────────────────────────────────────────
+
+    def warm(self) -> int:
+        """Create/backfill the table and load recent hashes into the Bloom filter"""
+        if self.warmed or self.conn is None:
+            return self.bloom.count
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(SEEN_SCHEMA)
+                cur.execute("SELECT 1 FROM seen_urls LIMIT 1")
+                if cur.fetchone() is None:
+                    self._backfill(cur)
+                cur.execute("DELETE FROM seen_urls WHERE first_seen < NOW() - %s * INTERVAL '1 day'",
+                            (RETENTION_DAYS,))
+                cur.execute("SELECT url_hash FROM seen_urls")
+                for (digest,) in cur:
+                    self.bloom.add(digest)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            self.conn = None  # seen-set disabled for this run: everything counts as new
+            print(f"⚠️ URL seen-set unavailable: {e}")
+            return 0
+        self.warmed = True
+        print(f"👀 URL seen-set warmed: {self.bloom.count} URLs")
+        return self.bloom.count
+
+    def _backfill(self, cur):
+        try:
+            cur.execute("SELECT url, MIN(fetched_at) FROM articles GROUP BY url")
+        except Exception:
+            self.conn.rollback()  # no articles table yet
+            cur.execute(SEEN_SCHEMA)
+            return
+        rows = {url_hash(url): (url, fetched_at) for url, fetched_at in cur.fetchall()}
+        self._insert(cur, [(digest, url, fetched_at) for digest, (url, fetched_at) in rows.items()])
+
+    # ─────────────────────────────────────────────────────
+    # LOOKUP / RECORD
+    # ─────────────────────────────────────────────────────
+
+    def filter_new(self, urls: Iterable[str]) -> List[str]:
+        """URLs not seen before, in input order. One query at most, only for Bloom hits."""
+        urls = list(urls)
+        if not self.warmed:
+            self.warm()
+        if not self.warmed:
+            return urls
+        digests = [url_hash(url) for url in urls]
+        maybe = [d for d in digests if d in self.bloom]
+        seen: Set[str] = set()
+        if maybe:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT url_hash FROM seen_urls WHERE url_hash = ANY(%s)", (maybe,))
+                seen = {row[0] for row in cur.fetchall()}
+            self.conn.commit()
+        fresh = [url for url, digest in zip(urls, digests) if digest not in seen]
+        self.skipped += len(urls) - len(fresh)
+        return fresh
+
+    def mark(self, urls: Iterable[str]):
+        """Record URLs as processed"""
+        rows = [(url_hash(url), normalize_url(url), None) for url in urls]
+        if not rows or self.conn is None:
+            return
+        try:
+            with self.conn.cursor() as cur:
+                self._insert(cur, rows)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"⚠️ Could not record seen URLs: {e}")
+            return
+        for digest, _, _ in rows:
+            self.bloom.add(digest)
+
+    @staticmethod
+    def _insert(cur, rows):
+        if rows:
+            execute_values(cur, """
+                INSERT INTO seen_urls (url_hash, url, first_seen)
+                VALUES %s
+                ON CONFLICT (url_hash) DO NOTHING
+            """, rows, template="(%s, %s, COALESCE(%s, NOW()))", page_size=1000)
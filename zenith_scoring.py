@@ -0,0 +1,222 @@
+"""
+🎯 ZENITH SCORING
+Single home for the Zenith Score formulas (crypto, stocks, forex)
+- calculate_*_score: the original one-dict-at-a-time functions (reference behaviour)
+- score_crypto / score_stocks: the same thresholds over NumPy columns, thousands of rows per call
+  (NumPy is optional: without it the list helpers fall back to the scalar functions)
+- Vendored as api/zenith_scoring.py and zenithscores-frontend/python_api/zenith_scoring.py,
+  which deploy on their own: change all three together
+Vectorized results are bit-identical to the scalar ones: the per-row component
+scores are small integers, so the final weighted/rounded value is looked up in a
+table built with the scalar arithmetic itself.
+"""
+
+from typing import Iterable, List, Tuple
+
+# NumPy - Made resilient (only the vectorized path needs it)
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+
+# ═══════════════════════════════════════════════════════
+# SCALAR REFERENCE
+# ═══════════════════════════════════════════════════════
+
+def calculate_zenith_score(pair: dict) -> float:
+    """Zenith Score for Crypto"""
+    try:
+        price_change = pair.get('priceChange', {})
+        h1 = float(price_change.get('h1', 0))
+        h6 = float(price_change.get('h6', 0))
+        h24 = float(price_change.get('h24', 0))
+
+        momentum_score = 0
+        if h1 > 0: momentum_score += 10
+        if h1 > 5: momentum_score += 10
+        if h6 > 0: momentum_score += 15
+        if h6 > 10: momentum_score += 15
+        if h24 > 0: momentum_score += 20
+        if h24 > 15: momentum_score += 30
+        momentum_score = min(momentum_score, 100)
+
+        liquidity = float(pair.get('liquidity', {}).get('usd', 0))
+        volume = float(pair.get('volume', {}).get('h24', 0))
+
+        vol_score = 0
+        if liquidity > 0:
+            vol_ratio = volume / liquidity
+            if vol_ratio > 0.1: vol_score += 20
+            if vol_ratio > 0.5: vol_score += 30
+            if vol_ratio > 1.0: vol_score += 50
+
+        if liquidity > 50000: vol_score += 20
+        if volume > 100000: vol_score += 30
+        vol_score = min(vol_score, 100)
+
+        social_score = 50
+
+        return _crypto_final(momentum_score, vol_score, social_score)
+    except Exception:
+        return 0.0
+
+def calculate_stock_score(stock: dict) -> float:
+    """Zenith Score for Stocks"""
+    try:
+        price = stock.get('price', 0)
+        change = stock.get('changesPercentage', 0)
+        volume = stock.get('volume', 0)
+        avg_volume = stock.get('avgVolume', 1)
+
+        trend_score = 50
+        if change > 0: trend_score += 10
+        if change > 2: trend_score += 20
+        if change > 5: trend_score += 20
+        if change < 0: trend_score -= 10
+        if change < -2: trend_score -= 20
+        trend_score = max(0, min(100, trend_score))
+
+        vol_score = 50
+        if volume > avg_volume: vol_score += 20
+        if volume > avg_volume * 1.5: vol_score += 30
+        vol_score = min(100, vol_score)
+
+        stability_score = 80
+
+        return _stock_final(trend_score, vol_score, stability_score)
+    except Exception:
+        return 50.0
+
+def calculate_forex_score(change: float) -> float:
+    """Simple Zenith Score for forex based on volatility"""
+    score = 50
+    abs_change = abs(change)
+    if abs_change > 0.5: score += 15
+    if abs_change > 1.0: score += 15
+    if abs_change > 2.0: score += 20
+    # Directional bonus
+    if change > 0: score += 5
+    return min(100, score)
+
+
+def _crypto_final(momentum_score: int, vol_score: int, social_score: int = 50) -> float:
+    final_score = (0.5 * momentum_score) + (0.3 * vol_score) + (0.2 * social_score)
+    return round(min(final_score, 100), 2)
+
+def _stock_final(trend_score: int, vol_score: int, stability_score: int = 80) -> float:
+    final_score = (0.5 * trend_score) + (0.3 * vol_score) + (0.2 * stability_score)
+    return round(final_score, 0)
+
+
+# Every reachable (component, component) pair -> final score, computed by the scalar code
+if NUMPY_AVAILABLE:
+    _CRYPTO_TABLE = np.array([[_crypto_final(m, v) for v in range(101)] for m in range(101)])
+    _STOCK_TABLE = np.array([[_stock_final(t, v) for v in range(101)] for t in range(101)])
+
+
+# ═══════════════════════════════════════════════════════
+# VECTORIZED
+# ═══════════════════════════════════════════════════════
+
+def score_crypto(h1: "np.ndarray", h6: "np.ndarray", h24: "np.ndarray",
+                 liquidity: "np.ndarray", volume: "np.ndarray") -> "np.ndarray":
+    """Zenith Scores for many pairs; inputs are float64 columns of equal length"""
+    h1, h6, h24 = (np.asarray(a, dtype=np.float64) for a in (h1, h6, h24))
+    liquidity = np.asarray(liquidity, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+
+    momentum = (10 * (h1 > 0) + 10 * (h1 > 5)
+                + 15 * (h6 > 0) + 15 * (h6 > 10)
+                + 20 * (h24 > 0) + 30 * (h24 > 15))
+    momentum = np.minimum(momentum, 100)
+
+    has_liquidity = liquidity > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(has_liquidity, volume / np.where(has_liquidity, liquidity, 1.0), 0.0)
+    vol = has_liquidity * (20 * (ratio > 0.1) + 30 * (ratio > 0.5) + 50 * (ratio > 1.0))
+    vol = vol + 20 * (liquidity > 50000) + 30 * (volume > 100000)
+    vol = np.minimum(vol, 100)
+
+    return _CRYPTO_TABLE[momentum, vol]
+
+
+def score_stocks(change: "np.ndarray", volume: "np.ndarray", avg_volume: "np.ndarray") -> "np.ndarray":
+    """Zenith Scores for many stocks; inputs are float64 columns of equal length"""
+    change = np.asarray(change, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    avg_volume = np.asarray(avg_volume, dtype=np.float64)
+
+    trend = (50 + 10 * (change > 0) + 20 * (change > 2) + 20 * (change > 5)
+             - 10 * (change < 0) - 20 * (change < -2))
+    trend = np.clip(trend, 0, 100)
+
+    vol = 50 + 20 * (volume > avg_volume) + 30 * (volume > avg_volume * 1.5)
+    vol = np.minimum(vol, 100)
+
+    return _STOCK_TABLE[trend, vol]
+
+
+# ═══════════════════════════════════════════════════════
+# DICT -> COLUMNS
+# ═══════════════════════════════════════════════════════
+
+def crypto_columns(pairs: Iterable[dict]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    DexScreener pairs -> (n, 5) float64 columns [h1, h6, h24, liquidity, volume] and a
+    validity mask. Rows the scalar function would reject (missing/non-numeric fields) are invalid.
+    """
+    rows, valid = [], []
+    for pair in pairs:
+        try:
+            price_change = pair.get('priceChange', {})
+            rows.append((
+                float(price_change.get('h1', 0)),
+                float(price_change.get('h6', 0)),
+                float(price_change.get('h24', 0)),
+                float(pair.get('liquidity', {}).get('usd', 0)),
+                float(pair.get('volume', {}).get('h24', 0)),
+            ))
+            valid.append(True)
+        except Exception:
+            rows.append((0.0, 0.0, 0.0, 0.0, 0.0))
+            valid.append(False)
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 5)
+    return columns, np.array(valid, dtype=bool)
+
+
+def score_pairs(pairs: List[dict]) -> List[float]:
+    """calculate_zenith_score over a list of pairs in one vectorized pass"""
+    if not pairs:
+        return []
+    if not NUMPY_AVAILABLE:
+        return [calculate_zenith_score(pair) for pair in pairs]
+    columns, valid = crypto_columns(pairs)
+    scores = score_crypto(*columns.T)
+    scores[~valid] = 0.0
+    return scores.tolist()
+
+
+def score_stock_rows(stocks: List[dict]) -> List[float]:
+    """calculate_stock_score over a list of dicts in one vectorized pass"""
+    if not stocks:
+        return []
+    if not NUMPY_AVAILABLE:
+        return [calculate_stock_score(stock) for stock in stocks]
+    rows, plain = [], []
+    for stock in stocks:
+        try:
+            values = (stock.get('changesPercentage', 0), stock.get('volume', 0), stock.get('avgVolume', 1))
+        except Exception:
+            values = None
+        # Anything but plain numbers keeps the scalar function's exact semantics (incl. its errors)
+        is_plain = values is not None and all(type(v) in (int, float) for v in values)
+        plain.append(is_plain)
+        rows.append(values if is_plain else (0.0, 0.0, 1.0))
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    scores = score_stocks(*columns.T).tolist()
+    for i, is_plain in enumerate(plain):
+        if not is_plain:
+            scores[i] = calculate_stock_score(stocks[i])
+    return scores
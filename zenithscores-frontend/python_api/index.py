@@ -438,71 +438,8 @@ class HealthResponse(BaseModel):
 # HELPER FUNCTIONS (Zenith Scoring)
 # ═══════════════════════════════════════════════════════
 
-def calculate_zenith_score(pair: dict) -> float:
-    """Zenith Score for Crypto"""
-    try:
-        price_change = pair.get('priceChange', {})
-        h1 = float(price_change.get('h1', 0))
-        h6 = float(price_change.get('h6', 0))
-        h24 = float(price_change.get('h24', 0))
-        
-        momentum_score = 0
-        if h1 > 0: momentum_score += 10
-        if h1 > 5: momentum_score += 10
-        if h6 > 0: momentum_score += 15
-        if h6 > 10: momentum_score += 15
-        if h24 > 0: momentum_score += 20
-        if h24 > 15: momentum_score += 30
-        momentum_score = min(momentum_score, 100)
-        
-        liquidity = float(pair.get('liquidity', {}).get('usd', 0))
-        volume = float(pair.get('volume', {}).get('h24', 0))
-        
-        vol_score = 0
-        if liquidity > 0:
-            vol_ratio = volume / liquidity
-            if vol_ratio > 0.1: vol_score += 20
-            if vol_ratio > 0.5: vol_score += 30
-            if vol_ratio > 1.0: vol_score += 50
-        
-        if liquidity > 50000: vol_score += 20
-        if volume > 100000: vol_score += 30
-        vol_score = min(vol_score, 100)
-        
-        social_score = 50 
-
-        final_score = (0.5 * momentum_score) + (0.3 * vol_score) + (0.2 * social_score)
-        return round(min(final_score, 100), 2)
-    except Exception:
-        return 0.0
-
-def calculate_stock_score(stock: dict) -> float:
-    """Zenith Score for Stocks"""
-    try:
-        price = stock.get('price', 0)
-        change = stock.get('changesPercentage', 0)
-        volume = stock.get('volume', 0)
-        avg_volume = stock.get('avgVolume', 1)
-        
-        trend_score = 50 
-        if change > 0: trend_score += 10
-        if change > 2: trend_score += 20
-        if change > 5: trend_score += 20
-        if change < 0: trend_score -= 10
-        if change < -2: trend_score -= 20
-        trend_score = max(0, min(100, trend_score))
-
-        vol_score = 50
-        if volume > avg_volume: vol_score += 20
-        if volume > avg_volume * 1.5: vol_score += 30
-        vol_score = min(100, vol_score)
-
-        stability_score = 80 
-
-        final_score = (0.5 * trend_score) + (0.3 * vol_score) + (0.2 * stability_score)
-        return round(final_score, 0)
-    except Exception:
-        return 50.0
+# Vendored copy of the repo root's zenith_scoring.py (this deployable ships without the root)
+from zenith_scoring import calculate_zenith_score, calculate_stock_score, calculate_forex_score
 
 # ═══════════════════════════════════════════════════════
 # CACHE
@@ -1164,18 +1101,6 @@ FOREX_PAIRS = [
 COMMODITY_SYMBOLS = ['WTI', 'BRENT', 'NATURAL_GAS', 'COPPER', 'ALUMINUM', 'WHEAT', 'CORN', 'COFFEE', 'COTTON', 'SUGAR']
 
 
-def calculate_forex_score(change: float) -> float:
-    """Simple Zenith Score for forex based on volatility"""
-    score = 50
-    abs_change = abs(change)
-    if abs_change > 0.5: score += 15
-    if abs_change > 1.0: score += 15
-    if abs_change > 2.0: score += 20
-    # Directional bonus
-    if change > 0: score += 5
-    return min(100, score)
-
-
 @app.get("/api/v1/forex/rates")
 def get_forex_rates(limit: int = 20):
     """Get forex exchange rates with Zenith Scores"""